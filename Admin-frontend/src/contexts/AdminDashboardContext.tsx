@@ -45,9 +45,18 @@ export const AdminDashboardProvider = ({ children }: { children: ReactNode }) =>
     setLoading(true);
     setError(null);
     try {
-      const res = await axios.get('/api/dashboard/admin-stats', { withCredentials: true });
-      const attendanceRes = await axios.get('/api/dashboard/attendance-departments', { withCredentials: true });
-      setStats(Object.assign({}, res.data, { attendance_departments: attendanceRes.data }) as AdminDashboardStats);
+      // One round trip for both dashboard resources
+      const res = await axios.post('/api/batch', {
+        requests: [
+          { id: 'stats', path: '/api/dashboard/admin-stats' },
+          { id: 'attendance', path: '/api/dashboard/attendance-departments' },
+        ],
+      }, { withCredentials: true });
+      const { stats: statsRes, attendance: attendanceRes } = res.data.responses;
+      if (statsRes.status !== 200 || attendanceRes.status !== 200) {
+        throw new Error('Dashboard batch request failed');
+      }
+      setStats(Object.assign({}, statsRes.body, { attendance_departments: attendanceRes.body }) as AdminDashboardStats);
     } catch (err: any) {
       setError('Failed to load dashboard stats');
     } finally {
@@ -61,6 +70,42 @@ export const AdminDashboardProvider = ({ children }: { children: ReactNode }) =>
     }
   }, [isAuthenticated, isLoading]);
 
+  // Live updates: apply submission deltas in place, refetch when permissions change
+  useEffect(() => {
+    if (!isAuthenticated || isLoading) return;
+    const source = new EventSource('/api/dashboard/stream', { withCredentials: true });
+
+    source.addEventListener('submission', (event) => {
+      const delta = JSON.parse((event as MessageEvent).data);
+      setStats((prev) => {
+        if (!prev) return prev;
+        const submitted = prev.total_surveys_submitted + delta.submitted;
+        let department_performance = prev.department_performance;
+        if (delta.rated_department && delta.department_average !== null) {
+          department_performance = [
+            ...prev.department_performance.filter((d) => d.name !== delta.rated_department),
+            { name: delta.rated_department, super_overall: delta.department_average },
+          ].sort((a, b) => a.name.localeCompare(b.name));
+        }
+        return {
+          ...prev,
+          total_surveys_submitted: submitted,
+          surveys_not_submitted: prev.total_surveys_assigned - submitted,
+          department_performance,
+          below_80_departments: department_performance.filter((d) => d.super_overall < 80).map((d) => d.name),
+          survey_attendance_stats: prev.survey_attendance_stats && {
+            on_time: prev.survey_attendance_stats.on_time + delta.on_time,
+            late: prev.survey_attendance_stats.late + delta.late,
+            missed: prev.total_surveys_assigned - submitted,
+          },
+        };
+      });
+    });
+    source.addEventListener('permissions', () => fetchStats());
+
+    return () => source.close();
+  }, [isAuthenticated, isLoading]);
+
   return (
     <AdminDashboardContext.Provider value={{ stats, loading, error, refresh: fetchStats }}>
       {children}
@@ -27,6 +27,18 @@ interface SavePermissionsRequestPayload {
 
 const API_BASE_URL = 'http://localhost:5000/api'; // Assuming your Flask backend runs on port 5000
 
+// Polls a backend background job until it finishes; throws if the job failed or takes longer than maxWaitMs
+const waitForJob = async (jobId: string, intervalMs = 1000, maxWaitMs = 10 * 60 * 1000) => {
+    const deadline = Date.now() + maxWaitMs;
+    while (Date.now() < deadline) {
+        const { data } = await axios.get(`${API_BASE_URL}/jobs/${jobId}`);
+        if (data.status === 'completed') return data;
+        if (data.status === 'failed') throw new Error(data.error || 'Background job failed');
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+    throw new Error(`Background job did not finish within ${Math.round(maxWaitMs / 60000)} minutes`);
+};
+
 const ManagePermissions = () => {
   const { departments, loading, error } = useDepartments(); 
   const { toast } = useToast();
@@ -321,7 +333,8 @@ const ManagePermissions = () => {
         };
 
         await axios.post<any>(`${API_BASE_URL}/permissions`, payload); // Pass the payload object directly
-        await axios.post(`${API_BASE_URL}/populate-surveys-from-permissions`); // Trigger survey population
+        const populateJob = await axios.post(`${API_BASE_URL}/populate-surveys-from-permissions`); // Trigger survey population
+        await waitForJob(populateJob.data.job_id); // Surveys must exist before questions are provisioned
         await axios.post(`${API_BASE_URL}/populate-questions-for-surveys`); // <-- Add this line!
         await axios.post(`${API_BASE_URL}/populate-question-options`); // Add this line
         // Refresh surveys or relevant UI here after population
@@ -5,6 +5,8 @@ import { useAuth } from '@/contexts/AuthContext';
 interface DepartmentRating {
   name: string;
   rating: number;
+  count: number;
+  categories: Record<string, number | null>; // Average 1-4 rating per category (QUALITY, DELIVERY, ...)
 }
 
 interface DashboardContextType {
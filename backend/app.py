@@ -18,8 +18,9 @@ import json
 from pyseto import Paseto
 from pyseto import Key
 
-# Configure logging to show info messages
-logging.basicConfig(level=logging.INFO)
+# Configure logging once for the whole app (JSON lines through a queue, see utils/logging_config.py)
+from backend.utils.logging_config import configure_logging
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Import custom modules
@@ -35,9 +36,16 @@ from backend.routes.department_routes import department_bp
 from backend.routes.remarks_routes import remarks_bp
 from backend.routes.excel_routes import excel_bp
 from backend.routes.dashboard_route import dashboard_bp
+from backend.routes.job_routes import job_bp
+from backend.routes.period_routes import period_bp
+from backend.routes.counter_routes import counter_bp
+from backend.routes.batch_routes import batch_bp
+from backend.routes.search_routes import search_bp
+from backend.routes.action_plan_routes import action_plan_bp
 
 # Import PASETO utilities
 from backend.utils.paseto_utils import PASETO_KEY, paseto, paseto_required
+from backend.utils.action_plans import start_sweeper as start_action_plan_sweeper
 
 app = Flask(__name__)
 
@@ -64,11 +72,10 @@ PASETO_COOKIE_PATH = '/'
 PASETO_COOKIE_SAMESITE = "Lax"
 
 # Debugging PASETO config
-print(f"DEBUG: PASETO_SECRET_KEY is set to: {'***KEY_IS_SET***' if PASETO_SECRET_KEY_HEX else '!!!KEY_IS_NOT_SET!!!'}")
-print(f"DEBUG: PASETO_COOKIE_NAME is: {PASETO_COOKIE_NAME}")
-
-print(f"DEBUG: PASETO_COOKIE_PATH is: {PASETO_COOKIE_PATH}")
-print(f"DEBUG: PASETO_COOKIE_SAMESITE is: {PASETO_COOKIE_SAMESITE}")
+logger.debug(
+    "PASETO config: key %s, cookie name %s, path %s, samesite %s",
+    'set' if PASETO_SECRET_KEY_HEX else 'NOT SET', PASETO_COOKIE_NAME, PASETO_COOKIE_PATH, PASETO_COOKIE_SAMESITE
+)
 
 # --- CORS Configuration ---
 CORS(app, supports_credentials=True, origins=["http://localhost:8080", "http://localhost:8081", "http://localhost:5173"])
@@ -102,7 +109,7 @@ def paseto_required(optional=False):
                 g.current_user_identity = decoded_token['identity']
                 return fn(*args, **kwargs)
             except Exception as e:
-                logger.error(f"PASETO validation failed: {e}")
+                logger.error("PASETO validation failed: %s", e)
                 return jsonify({"msg": "Invalid or tampered token"}), 401
         return decorator
     return wrapper
@@ -140,7 +147,7 @@ def login():
     username = request.json.get("username", None)
     password = request.json.get("password", None)
 
-    logger.info(f"Login attempt for username: {username}")
+    logger.info("Login attempt for username: %s", username)
 
     user = db.query(User).filter(User.username == username).first()
 
@@ -173,7 +180,7 @@ def login():
         set_paseto_cookies(response, new_paseto_token)
         return response
     else:
-        logger.warning(f"Login failed for username: {username}. Invalid credentials.")
+        logger.warning("Login failed for username: %s. Invalid credentials.", username)
         return jsonify({"detail": "Invalid username or password"}), 401
 
 @app.route("/logout", methods=["POST"])
@@ -184,9 +191,9 @@ def logout():
     try:
         user_identity = get_paseto_identity()
         username_for_log = user_identity if user_identity else 'unknown_user'
-        logger.info(f"User {username_for_log} logged out. PASETO cookie unset.")
+        logger.info("User %s logged out. PASETO cookie unset.", username_for_log)
     except Exception as e:
-        logger.error(f"Error getting PASETO identity during logout for logging purposes: {e}")
+        logger.error("Error getting PASETO identity during logout for logging purposes: %s", e)
         logger.info("User logout requested, cookie removed (identity could not be determined).")
     return response
 
@@ -208,7 +215,7 @@ def verify_auth():
                 "role": get_frontend_role(user.role),
                 "is_active": user.is_active
             }
-            logger.info(f"Verify Auth: User {current_username} authenticated and user data retrieved.")
+            logger.debug("Verify Auth: User %s authenticated and user data retrieved.", current_username)
             
             # Re-issue PASETO token to refresh its lifespan
             payload = {
@@ -229,7 +236,7 @@ def verify_auth():
             set_paseto_cookies(response, new_paseto_token)
             return response
         else:
-            logger.warning(f"Verify Auth: Token provided for user {current_username}, but user not found in DB.")
+            logger.warning("Verify Auth: Token provided for user %s, but user not found in DB.", current_username)
             response = make_response(jsonify({
                 "isAuthenticated": False,
                 "message": "User associated with token not found"
@@ -259,13 +266,14 @@ def request_password_reset():
     db.close()
 
     if not user:
-        print(f"Password reset requested for non-existent email: {email}. (Simulated)")
+        logger.info("Password reset requested for non-existent email: %s. (Simulated)", email)
         return jsonify({"message": "If an account with that email exists, a password reset link has been sent."}), 200
 
     reset_token = secrets.token_urlsafe(32)
-    print(f"\n--- SIMULATED Password Reset Link for {user.username} ({user.email}) ---")
-    print(f"Reset Link: http://localhost:8081/reset_password?token={reset_token}")
-    print("-------------------------------------------------------------------\n")
+    logger.info(
+        "SIMULATED password reset link for %s (%s): http://localhost:8081/reset_password?token=%s",
+        user.username, user.email, reset_token
+    )
 
     return jsonify({"message": "If an account with that email exists, a password reset link has been sent."}), 200
 
@@ -282,6 +290,12 @@ except NameError:
 app.register_blueprint(remarks_bp)
 app.register_blueprint(excel_bp)
 app.register_blueprint(dashboard_bp)
+app.register_blueprint(job_bp)
+app.register_blueprint(period_bp)
+app.register_blueprint(counter_bp)
+app.register_blueprint(batch_bp)
+app.register_blueprint(search_bp)
+app.register_blueprint(action_plan_bp)
 
 # --- Basic Home Route ---
 @app.route('/')
@@ -291,5 +305,9 @@ def home():
 
 # --- Application Entry Point ---
 if __name__ == '__main__':
-    logger.info(f"Flask app running on http://0.0.0.0:5000")
+    # The debug reloader runs this block in a watcher and a server process; only the server sweeps.
+    # Deployments without this entry point run backend/scripts/sweep_action_plans.py from cron instead.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_action_plan_sweeper()
+    logger.info("Flask app running on http://0.0.0.0:5000")
     app.run(debug=True, port=5000, host='0.0.0.0')
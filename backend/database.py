@@ -14,13 +14,14 @@ DATABASE_URL = (
 )
 
 # Create the SQLAlchemy engine
-# echo=True will print all SQL statements, useful for debugging
+# Set SQL_ECHO=1 to log every SQL statement (debugging only; it is per-statement output)
 engine = create_engine(
     DATABASE_URL,
-    echo=True,
+    echo=os.getenv('SQL_ECHO', '').lower() in ('1', 'true', 'yes'),
     pool_size=20,        # default is 5
     max_overflow=20,     # default is 10
-    pool_timeout=30      # seconds
+    pool_timeout=30,     # seconds
+    fast_executemany=True  # pyodbc: send executemany() batches in one round trip
 )
 
 # Create a SessionLocal class for database sessions
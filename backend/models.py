@@ -1,7 +1,7 @@
 # F:\LLS Survey\backend\models.py
 
 from backend.database import Base
-from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, UniqueConstraint, Text, Enum, Float, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, UniqueConstraint, Text, Enum, Float, Boolean, Index
 from sqlalchemy.orm import relationship
 
 # --- User Model ---
@@ -145,6 +145,7 @@ class SurveySubmission(Base):
     suggestions = Column(Text, nullable=True)
     answers_by_category = Column(Text, nullable=True)
     survey_attendance = Column(Float, nullable=True)  # New column for survey attendance percentage
+    rating_vector = Column(String(20), nullable=True)  # Packed ratings '0'-'4' by question order, see utils/rating_vectors.py
     survey = relationship("Survey", back_populates="submissions")
     submitter = relationship("User", back_populates="survey_submissions_made")
     answers = relationship(
@@ -198,7 +199,10 @@ class Period(Base):
 # --- SurveyResponse Model ---
 class SurveyResponse(Base):
     __tablename__ = "survey_responses"
-    __table_args__ = {'schema': 'dbo'}
+    __table_args__ = (Index('ix_survey_responses_to_dept_submitted', 'to_department_id', 'submitted_at'),
+                      Index('ix_survey_responses_from_dept_submitted', 'from_department_id', 'submitted_at'),
+                      Index('ix_survey_responses_to_dept_ack_target', 'to_department_id', 'acknowledged', 'target_date'),
+                      {'schema': 'dbo'})
 
     id = Column(Integer, primary_key=True, index=True)
     survey_id = Column(Integer, nullable=False)
@@ -227,3 +231,163 @@ class SurveyResponse(Base):
 
     def __repr__(self):
         return f"<SurveyResponse(id={self.id}, survey_id={self.survey_id}, user_id={self.user_id})>"
+
+# --- Archive Models ---
+# Closed periods are moved out of the hot survey_* tables into these archive
+# tables (see scripts/archive_periods.py). Rows keep their original ids and are
+# tagged with period_id, which leads every archive index so a period can be
+# read or dropped as one contiguous range. No foreign keys, so archived rows
+# never block maintenance on the live tables.
+class ArchivedSurveySubmission(Base):
+    __tablename__ = "survey_submissions_archive"
+    __table_args__ = (Index('ix_submissions_archive_period', 'period_id', 'rated_department_id'),
+                      {'schema': 'dbo'})
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    period_id = Column(Integer, nullable=False)
+    survey_id = Column(Integer, nullable=False)
+    submitter_user_id = Column(Integer, nullable=False)
+    submitted_at = Column(DateTime)
+    submitter_department_id = Column(Integer, nullable=False)
+    rated_department_id = Column(Integer, nullable=False)
+    overall_customer_rating = Column(Float, nullable=True)
+    rating_description = Column(Text, nullable=True)
+    suggestions = Column(Text, nullable=True)
+    answers_by_category = Column(Text, nullable=True)
+    survey_attendance = Column(Float, nullable=True)
+    rating_vector = Column(String(20), nullable=True)
+    status = Column(String(32))
+    archived_at = Column(DateTime, server_default=func.now())
+
+    def __repr__(self):
+        return f"<ArchivedSurveySubmission(id={self.id}, period_id={self.period_id}, survey_id={self.survey_id})>"
+
+class ArchivedAnswer(Base):
+    __tablename__ = "survey_answers_archive"
+    __table_args__ = (Index('ix_answers_archive_period', 'period_id', 'submission_id'),
+                      {'schema': 'dbo'})
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    period_id = Column(Integer, nullable=False)
+    submission_id = Column(Integer, nullable=False)
+    question_id = Column(Integer, nullable=False)
+    rating_value = Column(Integer, nullable=True)
+    text_response = Column(Text, nullable=True)
+    selected_option_id = Column(Integer, nullable=True)
+
+    def __repr__(self):
+        return f"<ArchivedAnswer(id={self.id}, period_id={self.period_id}, submission_id={self.submission_id})>"
+
+class ArchivedSurveyResponse(Base):
+    __tablename__ = "survey_responses_archive"
+    __table_args__ = (Index('ix_responses_archive_period', 'period_id', 'to_department_id'),
+                      {'schema': 'dbo'})
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    period_id = Column(Integer, nullable=False)
+    survey_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    survey_submission_id = Column(Integer, nullable=True)
+    question_id = Column(Integer, nullable=True)
+    submitted_at = Column(DateTime)
+    final_suggestion = Column(Text)
+    from_department_id = Column(Integer)
+    to_department_id = Column(Integer)
+    rating = Column(Integer)
+    remark = Column(Text)
+    explanation = Column(Text)
+    action_plan = Column(Text)
+    responsible_person = Column(String(255))
+    acknowledged = Column(Boolean, default=False)
+    updated_at = Column(DateTime)
+    responded_at = Column(DateTime, nullable=True)
+    target_date = Column(DateTime, nullable=True)
+    overall_rating = Column(Float, nullable=True)
+    super_overall = Column(Float, nullable=True)
+
+    def __repr__(self):
+        return f"<ArchivedSurveyResponse(id={self.id}, period_id={self.period_id}, survey_id={self.survey_id})>"
+
+# --- Dashboard Snapshot Model ---
+# Single materialized row (id=1) holding the admin dashboard counters.
+# Maintained incrementally by the submission path, recomputed on demand.
+class DashboardSnapshot(Base):
+    __tablename__ = "dashboard_snapshot"
+    __table_args__ = {'schema': 'dbo'}
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    total_surveys_assigned = Column(Integer, nullable=False, default=0)
+    total_surveys_submitted = Column(Integer, nullable=False, default=0)
+    on_time_submissions = Column(Integer, nullable=False, default=0)
+    late_submissions = Column(Integer, nullable=False, default=0)
+    department_performance = Column(Text, nullable=True)  # JSON: {department name: average overall rating}
+    updated_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<DashboardSnapshot(id={self.id}, updated_at={self.updated_at})>"
+
+# --- Department Period Rating Rollup ---
+# One row per (rated department, period) with running aggregates of the
+# submission overall ratings and per-category score sums (category scores are
+# each submission's category average on the 1-4 scale). Maintained
+# incrementally on submission, rebuilt with one GROUP BY by
+# backend/utils/period_ratings.py. Serves /api/dashboard/trends.
+class DepartmentPeriodRating(Base):
+    __tablename__ = "department_period_ratings"
+    __table_args__ = {'schema': 'dbo'}
+
+    department_id = Column(Integer, primary_key=True, autoincrement=False)
+    period_id = Column(Integer, primary_key=True, autoincrement=False)
+    rating_sum = Column(Float, nullable=False, default=0)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_min = Column(Float, nullable=True)
+    rating_max = Column(Float, nullable=True)
+    category_count = Column(Integer, nullable=False, default=0)  # Submissions with a rating vector
+    quality_sum = Column(Float, nullable=False, default=0)
+    delivery_sum = Column(Float, nullable=False, default=0)
+    communication_sum = Column(Float, nullable=False, default=0)
+    responsiveness_sum = Column(Float, nullable=False, default=0)
+    improvement_sum = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<DepartmentPeriodRating(department_id={self.department_id}, period_id={self.period_id}, rating_count={self.rating_count})>"
+
+# --- Department Counters Model ---
+# Navigation badge numbers per department, kept current by the write paths
+# (see backend/utils/counters.py). pending_surveys counts the surveys of
+# period_id, the period that was current when the row was computed.
+class DepartmentCounters(Base):
+    __tablename__ = "department_counters"
+    __table_args__ = {'schema': 'dbo'}
+
+    department_id = Column(Integer, primary_key=True, autoincrement=False)
+    period_id = Column(Integer, nullable=True)
+    pending_surveys = Column(Integer, nullable=False, default=0)
+    incoming_unanswered = Column(Integer, nullable=False, default=0)
+    outgoing_unacknowledged = Column(Integer, nullable=False, default=0)
+    overdue_action_plans = Column(Integer, nullable=False, default=0)
+    due_soon_action_plans = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<DepartmentCounters(department_id={self.department_id}, pending_surveys={self.pending_surveys})>"
+
+# --- Action Plan Alert Model ---
+# Materialized list of unacknowledged action plans that are overdue or due
+# soon, rebuilt by the periodic sweep in backend/utils/action_plans.py.
+class ActionPlanAlert(Base):
+    __tablename__ = "action_plan_alerts"
+    __table_args__ = (Index('ix_action_plan_alerts_dept_status', 'to_department_id', 'status', 'target_date'),
+                      {'schema': 'dbo'})
+
+    response_id = Column(Integer, primary_key=True, autoincrement=False)
+    to_department_id = Column(Integer, nullable=False)
+    from_department_id = Column(Integer, nullable=True)
+    target_date = Column(DateTime, nullable=False)
+    status = Column(String(16), nullable=False)  # 'overdue' or 'due_soon'
+    responsible_person = Column(String(255), nullable=True)
+    swept_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<ActionPlanAlert(response_id={self.response_id}, status='{self.status}', target_date={self.target_date})>"
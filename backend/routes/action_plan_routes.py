@@ -0,0 +1,62 @@
+from flask import Blueprint, request, jsonify
+from sqlalchemy.orm import Session, aliased
+from datetime import datetime
+from backend.database import SessionLocal
+from backend.models import ActionPlanAlert, SurveyResponse, Department
+from backend.utils.paseto_utils import paseto_required, get_paseto_identity
+from backend.utils.response_cache import response_cache
+from backend.utils.action_plans import sweep_action_plans, alert_to_dict, STATUS_COUNTERS
+from backend.utils.jobs import job_registry
+
+action_plan_bp = Blueprint('action_plans', __name__, url_prefix='/api/action-plans')
+
+MAX_LIMIT = 1000
+
+FromDepartment = aliased(Department)
+
+# --- Overdue and Due-Soon Action Plans ---
+# Served from the last sweep: ?status=overdue|due_soon, ?department_id=
+# (defaults to the caller's department), ?limit=, ?offset=
+@action_plan_bp.route('', methods=['GET'])
+@paseto_required()
+def get_action_plan_alerts():
+    department_id = request.args.get('department_id', type=int) or response_cache.department_for(get_paseto_identity())
+    if not department_id:
+        return jsonify({"detail": "User's department not found"}), 404
+    status = request.args.get('status')
+    if status is not None and status not in STATUS_COUNTERS:
+        return jsonify({"detail": f"status must be one of: {', '.join(STATUS_COUNTERS)}"}), 400
+    limit = min(max(request.args.get('limit', 200, type=int), 1), MAX_LIMIT)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+
+    db: Session = SessionLocal()
+    try:
+        query = (
+            db.query(ActionPlanAlert, SurveyResponse.action_plan, FromDepartment.name)
+            .join(SurveyResponse, SurveyResponse.id == ActionPlanAlert.response_id)
+            .outerjoin(FromDepartment, FromDepartment.id == ActionPlanAlert.from_department_id)
+            .filter(ActionPlanAlert.to_department_id == department_id)
+        )
+        if status:
+            query = query.filter(ActionPlanAlert.status == status)
+        rows = query.order_by(ActionPlanAlert.target_date, ActionPlanAlert.response_id).limit(limit).offset(offset).all()
+
+        now = datetime.now()
+        alerts = [
+            {**alert_to_dict(alert, now), "action_plan": action_plan, "from_department": from_department}
+            for alert, action_plan, from_department in rows
+        ]
+        return jsonify({"department_id": department_id, "count": len(alerts), "alerts": alerts}), 200
+    finally:
+        db.close()
+
+# --- Run the Sweep Now ---
+@action_plan_bp.route('/sweep', methods=['POST'])
+@paseto_required()
+def sweep_action_plans_now():
+    job = job_registry.submit('sweep_action_plans', sweep_action_plans)
+    return jsonify({
+        "message": "Action plan sweep started.",
+        "job_id": job.id,
+        "status_url": f"/api/jobs/{job.id}"
+    }), 202
@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify, current_app, g
+from werkzeug.exceptions import HTTPException
+from backend.utils.paseto_utils import paseto_required, get_paseto_identity
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+batch_bp = Blueprint('batch', __name__, url_prefix='/api/batch')
+
+MAX_BATCH_SIZE = 10
+BATCH_WORKERS = 4
+# Endpoints that cannot be answered as one JSON value
+EXCLUDED_ENDPOINTS = {'batch.run_batch', 'dashboard.stream_dashboard_events'}
+
+_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='batch')
+
+def _dispatch(app, identity, path, args):
+    """Runs one internal GET view in its own request context, without the HTTP round trip."""
+    with app.test_request_context(path, method='GET', query_string=args):
+        g.batch_principal = identity
+        try:
+            if request.routing_exception is not None:
+                raise request.routing_exception
+            if request.url_rule.endpoint in EXCLUDED_ENDPOINTS:
+                return {"status": 400, "body": {"detail": f"{path} cannot be batched"}}
+            view = app.view_functions[request.url_rule.endpoint]
+            response = app.make_response(view(**request.view_args))
+        except HTTPException as e:
+            return {"status": e.code, "body": {"detail": e.description}}
+        except Exception as e:
+            logger.error("Batch sub-request %s failed: %s", path, e, exc_info=True)
+            return {"status": 500, "body": {"detail": f"Error: {str(e)}"}}
+
+        if not response.is_json:
+            return {"status": 400, "body": {"detail": f"{path} did not return JSON"}}
+        return {"status": response.status_code, "body": response.get_json()}
+
+# --- Fetch Several Resources in One Round Trip ---
+@batch_bp.route('', methods=['POST'])
+@paseto_required()
+def run_batch():
+    data = request.get_json(silent=True) or {}
+    sub_requests = data.get('requests')
+    if not isinstance(sub_requests, list) or not sub_requests:
+        return jsonify({"detail": "'requests' must be a non-empty list"}), 400
+    if len(sub_requests) > MAX_BATCH_SIZE:
+        return jsonify({"detail": f"At most {MAX_BATCH_SIZE} requests per batch"}), 400
+
+    app = current_app._get_current_object()
+    identity = get_paseto_identity()
+    futures = {}
+    for index, item in enumerate(sub_requests):
+        if not isinstance(item, dict) or not str(item.get('path', '')).startswith('/api/'):
+            return jsonify({"detail": f"Request {index} needs a 'path' under /api/"}), 400
+        key = str(item.get('id', index))
+        if key in futures:
+            return jsonify({"detail": f"Duplicate request id '{key}'"}), 400
+        futures[key] = _executor.submit(_dispatch, app, identity, item['path'], item.get('args') or {})
+
+    return jsonify({"responses": {key: future.result() for key, future in futures.items()}}), 200
@@ -0,0 +1,22 @@
+from flask import Blueprint, request, jsonify
+from sqlalchemy.orm import Session
+from backend.database import SessionLocal
+from backend.utils.paseto_utils import paseto_required, get_paseto_identity
+from backend.utils.response_cache import response_cache
+from backend.utils.counters import get_counters, counters_to_dict
+
+counter_bp = Blueprint('counters', __name__, url_prefix='/api/counters')
+
+# --- Navigation Badge Counters for the User's Department ---
+@counter_bp.route('', methods=['GET'])
+@paseto_required()
+def get_department_counters():
+    department_id = response_cache.department_for(get_paseto_identity())
+    if not department_id:
+        return jsonify({"detail": "User's department not found"}), 404
+    db: Session = SessionLocal()
+    try:
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+        return jsonify(counters_to_dict(get_counters(db, department_id, refresh=refresh))), 200
+    finally:
+        db.close()
@@ -1,14 +1,31 @@
-from flask import Blueprint, jsonify
+import queue
+from flask import Blueprint, jsonify, request, Response, stream_with_context
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from backend.database import SessionLocal
-from backend.models import SurveyResponse, Department, User, Survey, SurveySubmission, Permission
+from backend.models import SurveyResponse, Department, User, Survey, SurveySubmission, Period
 from backend.utils.paseto_utils import paseto_required, get_paseto_identity
+from backend.utils.periods import parse_period_date, get_current_period, get_previous_period
+from backend.utils.attendance import department_attendance
+from backend.utils.rating_vectors import category_score_expressions
+from backend.utils.dashboard_snapshot import get_snapshot, snapshot_to_stats, BELOW_TARGET_SCORE
+from backend.utils.response_cache import cached_response, response_cache, invalidate_dashboards, refresh_requested, SCOPE_DEPARTMENT
+from backend.utils.single_flight import single_flight, flights
+from backend.utils.events import broadcaster, format_sse
+from backend.utils.period_ratings import department_trend
+from backend.utils.history import survey_responses_with_history
+from backend.utils.rating_stats import period_rating_stats
+from backend.utils.question_analytics import question_analytics
+from backend.utils.leaderboard import leaderboard
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 
+# Seconds between keep-alive comments on an idle event stream
+STREAM_HEARTBEAT_SECONDS = 15
+
 @dashboard_bp.route('/department-ratings', methods=['GET'])
 @paseto_required()
+@cached_response('dashboard', ttl=120, scope=SCOPE_DEPARTMENT)
 def get_department_ratings():
     db: Session = SessionLocal()
     try:
@@ -17,31 +34,47 @@ def get_department_ratings():
         if not user or not user.department_id:
             return jsonify([])
 
-        # Get all overall ratings given to the user's department (to_department_id)
-        results = (
+        period_id = request.args.get('period', type=int)
+        try:
+            since = parse_period_date(request.args.get('since'))
+        except ValueError:
+            return jsonify({"detail": "Invalid 'since' date. Expected ISO string."}), 400
+
+        # One grouped query: overall average, response count and per-category
+        # averages (decoded from the packed rating vector) per rating department
+        category_scores = category_score_expressions(SurveySubmission.rating_vector)
+        query = (
             db.query(
-                SurveyResponse.from_department_id,
                 Department.name,
-                SurveyResponse.overall_rating
+                func.avg(SurveyResponse.overall_rating).label('rating'),
+                func.count(SurveyResponse.id).label('count'),
+                *[func.avg(expr).label(category) for category, expr in category_scores.items()]
             )
             .join(Department, SurveyResponse.from_department_id == Department.id)
+            .outerjoin(SurveySubmission, SurveySubmission.id == SurveyResponse.survey_submission_id)
             .filter(
                 SurveyResponse.to_department_id == user.department_id,
                 SurveyResponse.overall_rating != None
             )
-            .all()
         )
+        if period_id:
+            query = query.join(Survey, Survey.id == SurveyResponse.survey_id).filter(Survey.period_id == period_id)
+        if since:
+            query = query.filter(SurveyResponse.submitted_at >= since)
 
-        # Aggregate by department (average if multiple ratings)
-        dept_ratings = {}
-        for from_dept_id, dept_name, rating in results:
-            if dept_name not in dept_ratings:
-                dept_ratings[dept_name] = []
-            dept_ratings[dept_name].append(rating)
+        results = query.group_by(Department.name).order_by(Department.name).all()
 
         data = [
-            {"name": dept, "rating": round(sum(ratings) / len(ratings), 2)}
-            for dept, ratings in dept_ratings.items()
+            {
+                "name": row.name,
+                "rating": round(row.rating, 2),
+                "count": row.count,
+                "categories": {
+                    category: round(getattr(row, category), 2) if getattr(row, category) is not None else None
+                    for category in category_scores
+                }
+            }
+            for row in results
         ]
         return jsonify(data)
     finally:
@@ -49,59 +82,25 @@ def get_department_ratings():
 
 @dashboard_bp.route('/admin-stats', methods=['GET'])
 @paseto_required()
+@cached_response('dashboard', ttl=30, bypass=refresh_requested)
+@single_flight('dashboard', bypass=refresh_requested)
 def get_admin_dashboard_stats():
     db: Session = SessionLocal()
     try:
-        # Total surveys assigned
-        total_surveys_assigned = db.query(Survey).count()
-        # Total surveys submitted
-        total_surveys_submitted = db.query(SurveySubmission).count()
-        # Surveys not submitted
-        surveys_not_submitted = total_surveys_assigned - total_surveys_submitted
-
-        # Department performance: average super_overall for each department (from SurveyResponse)
-        dept_performance = (
-            db.query(Department.name, func.avg(SurveyResponse.super_overall))
-            .join(SurveyResponse, SurveyResponse.to_department_id == Department.id)
-            .filter(SurveyResponse.super_overall != None)
-            .group_by(Department.name)
-            .all()
-        )
-        department_performance = [
-            {"name": name, "super_overall": round(avg or 0, 2)}
-            for name, avg in dept_performance
-        ]
-
-        # Departments below 80%
-        below_80_departments = [
-            d["name"] for d in department_performance if d["super_overall"] < 80
-        ]
-
-        # Survey attendance stats for admin dashboard pie chart
-        total_submissions = db.query(SurveySubmission).count()
-        on_time_submissions = db.query(SurveySubmission).filter(SurveySubmission.survey_attendance == 100.0).count()
-        late_submissions = db.query(SurveySubmission).filter(SurveySubmission.survey_attendance == 95.0).count()
-        missed_submissions = total_surveys_assigned - total_submissions
-
-        survey_attendance_stats = {
-            "on_time": on_time_submissions,
-            "late": late_submissions,
-            "missed": missed_submissions
-        }
-
-        return jsonify({
-            "total_surveys_assigned": total_surveys_assigned,
-            "total_surveys_submitted": total_surveys_submitted,
-            "surveys_not_submitted": surveys_not_submitted,
-            "department_performance": department_performance,
-            "below_80_departments": below_80_departments,
-            "survey_attendance_stats": survey_attendance_stats
-        })
+        # Primary-key read of the materialized snapshot; ?refresh=true forces a full
+        # recompute, past the response cache and any request already in flight
+        refresh = refresh_requested()
+        snapshot = get_snapshot(db, refresh=refresh)
+        if refresh:
+            invalidate_dashboards()
+        return jsonify(snapshot_to_stats(snapshot))
     finally:
         db.close()
 
 @dashboard_bp.route('/pending-surveys', methods=['GET'])
 @paseto_required()
+@cached_response('dashboard', ttl=60)
+@single_flight('dashboard')
 def get_departments_pending_surveys():
     db: Session = SessionLocal()
     try:
@@ -162,85 +161,209 @@ def get_departments_pending_surveys():
 
 @dashboard_bp.route('/attendance-departments', methods=['GET'])
 @paseto_required()
+@cached_response('dashboard', ttl=60)
+@single_flight('dashboard')
 def get_attendance_departments():
-    from datetime import timedelta
     db: Session = SessionLocal()
     try:
-        # Query departments with on_time attendance
-        on_time_depts = (
-            db.query(Department.name)
-            .join(SurveySubmission, SurveySubmission.submitter_department_id == Department.id)
-            .filter(SurveySubmission.survey_attendance == 100.0)
-            .distinct()
-            .all()
-        )
-        # Query departments with late attendance
-        late_depts = (
-            db.query(Department.name)
-            .join(SurveySubmission, SurveySubmission.submitter_department_id == Department.id)
-            .filter(SurveySubmission.survey_attendance == 95.0)
-            .distinct()
-            .all()
+        period_id = request.args.get('period', type=int)
+        if not period_id:
+            current = get_current_period(db)
+            period_id = current.id if current else None
+        departments = department_attendance(db, period_id) if period_id else []
+
+        missed_departments = [d["name"] for d in departments if d["missed"]]
+        return jsonify({
+            "period_id": period_id,
+            "on_time_departments": [d["name"] for d in departments if d["on_time"]],
+            "late_departments": [d["name"] for d in departments if d["late"]],
+            "missed_departments": missed_departments,
+            "missed_count": len(missed_departments),
+            "departments": departments
+        })
+    finally:
+        db.close()
+
+# --- Department Score Trend Across Periods ---
+@dashboard_bp.route('/trends', methods=['GET'])
+@paseto_required()
+@cached_response('dashboard', ttl=300, scope=SCOPE_DEPARTMENT)
+def get_department_trends():
+    db: Session = SessionLocal()
+    try:
+        department_id = request.args.get('department_id', type=int)
+        if department_id is None:
+            username = get_paseto_identity()
+            user = db.query(User).filter(User.username == username).first()
+            if not user or not user.department_id:
+                return jsonify({"department_id": None, "trend": []})
+            department_id = user.department_id
+
+        department = db.query(Department).filter(Department.id == department_id).first()
+        if not department:
+            return jsonify({"detail": "Department not found"}), 404
+
+        return jsonify({
+            "department_id": department.id,
+            "department": department.name,
+            "trend": department_trend(db, department.id)
+        })
+    finally:
+        db.close()
+
+# --- From x To Department Rating Heatmap ---
+@dashboard_bp.route('/heatmap', methods=['GET'])
+@paseto_required()
+@cached_response('dashboard', ttl=300)
+def get_rating_heatmap():
+    db: Session = SessionLocal()
+    try:
+        period_id = request.args.get('period', type=int)
+        if period_id is None:
+            period = get_current_period(db)
+            period_id = period.id if period else None
+
+        departments = db.query(Department.id, Department.name).order_by(Department.name).all()
+        index = {dept_id: i for i, (dept_id, _) in enumerate(departments)}
+        size = len(departments)
+
+        # One grouped query for the whole matrix; archived periods included
+        Responses = survey_responses_with_history()
+        query = (
+            db.query(
+                Responses.from_department_id,
+                Responses.to_department_id,
+                func.avg(Responses.overall_rating),
+                func.count(Responses.id)
+            )
+            .filter(Responses.overall_rating != None)
+            .group_by(Responses.from_department_id, Responses.to_department_id)
         )
-        # Query all departments
-        all_departments = db.query(Department).all()
-
-        # Get permission end dates for departments
-        permissions = db.query(Permission).all()
-
-        # Get submissions grouped by department
-        submissions = db.query(SurveySubmission).filter(SurveySubmission.status != 'Draft').all()
-
-        # Build a map of dept_id to permission end_date
-        permission_map = {p.to_dept_id: p.end_date for p in permissions}
-
-        # Build a map of dept_id to list of submission dates
-        submission_map = {}
-        for sub in submissions:
-            submission_map.setdefault(sub.submitter_department_id, []).append(sub.submitted_at)
-
-        grace_period = timedelta(days=7)
-
-        missed_departments = []
-        from datetime import datetime
-        now = datetime.utcnow()
-        for dept in all_departments:
-            end_date = permission_map.get(dept.id)
-            print(f"Department: {dept.name}, Permission End Date: {end_date}")
-            if not end_date:
-                # If no permission end date, consider department missed
-                print(f"Department {dept.name} has no permission end date, marked as missed")
-                missed_departments.append(dept.name)
-                continue
-            grace_end = end_date + grace_period
-            print(f"Department: {dept.name}, Grace Period End: {grace_end}, Current Time: {now}")
-            # Only consider missed if current time is past grace period end
-            if now <= grace_end:
-                print(f"Department: {dept.name} is still within grace period, not missed")
-                continue
-            # Check if any submission is within grace period
-            submitted_within_grace = False
-            for sub_date in submission_map.get(dept.id, []):
-                print(f"Department: {dept.name}, Submission Date: {sub_date}")
-                if sub_date and sub_date <= grace_end:
-                    submitted_within_grace = True
-                    print(f"Department: {dept.name} has submission within grace period")
-                    break
-            if not submitted_within_grace:
-                print(f"Department: {dept.name} has no submission within grace period, marked as missed")
-                missed_departments.append(dept.name)
+        if period_id is not None:
+            query = query.join(Survey, Survey.id == Responses.survey_id).filter(Survey.period_id == period_id)
 
-        total_assigned = db.query(func.count(Survey.id)).scalar()
-        total_submitted = db.query(func.count(SurveySubmission.id)).filter(SurveySubmission.status != 'Draft').scalar()
-        # Update missed_count to count of missed_departments after grace period
-        missed_count = len(missed_departments)
+        # Dense row-major arrays: cell (from i, to j) lives at i * size + j
+        scores = [None] * (size * size)
+        counts = [0] * (size * size)
+        for from_id, to_id, average, count in query.all():
+            if from_id in index and to_id in index:
+                cell = index[from_id] * size + index[to_id]
+                scores[cell] = round(average, 2)
+                counts[cell] = count
 
         return jsonify({
-            "on_time_departments": [d.name for d in on_time_depts],
-            "late_departments": [d.name for d in late_depts],
-            "missed_departments": missed_departments,
-            "missed_count": missed_count
+            "period_id": period_id,
+            "departments": [{"id": dept_id, "name": name} for dept_id, name in departments],
+            "size": size,
+            "scores": scores,
+            "counts": counts
         })
     finally:
         db.close()
 
+# --- Rating Distribution Statistics ---
+@dashboard_bp.route('/rating-stats', methods=['GET'])
+@paseto_required()
+@cached_response('dashboard', ttl=300)
+def get_rating_stats():
+    db: Session = SessionLocal()
+    try:
+        period_id = request.args.get('period', type=int)
+        if period_id is None:
+            period = get_current_period(db)
+            period_id = period.id if period else None
+        department_id = request.args.get('department_id', type=int)
+        return jsonify(period_rating_stats(db, period_id, rated_department_id=department_id))
+    finally:
+        db.close()
+
+# --- Question-Level Analytics ---
+@dashboard_bp.route('/question-analytics', methods=['GET'])
+@paseto_required()
+@cached_response('dashboard', ttl=300)
+def get_question_analytics():
+    db: Session = SessionLocal()
+    try:
+        period_id = request.args.get('period', type=int)
+        if period_id is None:
+            period = get_current_period(db)
+            period_id = period.id if period else None
+        department_id = request.args.get('department_id', type=int)
+        return jsonify(question_analytics(db, period_id, rated_department_id=department_id))
+    finally:
+        db.close()
+
+# --- Department Leaderboard ---
+@dashboard_bp.route('/leaderboard', methods=['GET'])
+@paseto_required()
+def get_department_leaderboard():
+    db: Session = SessionLocal()
+    try:
+        period_id = request.args.get('period', type=int)
+        period = db.get(Period, period_id) if period_id is not None else get_current_period(db)
+        if not period:
+            return jsonify({"detail": "Period not found"}), 404
+        page = max(request.args.get('page', 1, type=int), 1)
+        page_size = min(max(request.args.get('page_size', 20, type=int), 1), 100)
+
+        ranking = leaderboard.get(db, period.id)
+        previous_period = get_previous_period(db, period)
+        previous = leaderboard.get(db, previous_period.id) if previous_period else None
+        names = dict(db.query(Department.id, Department.name).all())
+
+        entries = []
+        for rank, department_id, score in ranking.page((page - 1) * page_size, page_size):
+            previous_rank = previous.rank(department_id) if previous else None
+            previous_score = previous.score(department_id) if previous else None
+            entries.append({
+                "rank": rank,
+                "department_id": department_id,
+                "name": names.get(department_id, "Unknown"),
+                "score": round(score, 2),
+                "percentile": ranking.percentile(rank),
+                "previous_rank": previous_rank,
+                "rank_delta": previous_rank - rank if previous_rank else None,
+                "score_delta": round(score - previous_score, 2) if previous_score is not None else None
+            })
+
+        return jsonify({
+            "period_id": period.id,
+            "previous_period_id": previous_period.id if previous_period else None,
+            "total": len(ranking),
+            "page": page,
+            "page_size": page_size,
+            "below_target_departments": [names.get(d, "Unknown") for d in ranking.below(BELOW_TARGET_SCORE)],
+            "entries": entries
+        })
+    finally:
+        db.close()
+
+@dashboard_bp.route('/cache-stats', methods=['GET'])
+@paseto_required()
+def get_dashboard_cache_stats():
+    return jsonify({**response_cache.stats(), "single_flight": flights.stats()})
+
+# --- Live dashboard updates (Server-Sent Events) ---
+@dashboard_bp.route('/stream', methods=['GET'])
+@paseto_required()
+def stream_dashboard_events():
+    subscription = broadcaster.subscribe()
+
+    def events():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    message = subscription.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(message)
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
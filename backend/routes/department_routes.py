@@ -42,10 +42,10 @@ def get_departments():
         # NOTE: You'll need to ensure DepartmentSchema is compatible with your Department model
         departments_data = [DepartmentSchema.from_orm(dept).model_dump() for dept in departments]
         
-        logger.info(f"Fetched {len(departments_data)} departments.")
+        logger.info("Fetched %s departments.", len(departments_data))
         return jsonify(departments_data), 200
     except Exception as e:
-        logger.error(f"Error fetching departments: {e}", exc_info=True) # Log full traceback
+        logger.error("Error fetching departments: %s", e, exc_info=True) # Log full traceback
         return jsonify({"message": "Internal server error fetching departments"}), 500
     finally:
         db.close()
@@ -74,11 +74,11 @@ def create_department():
         db.add(new_dept)
         db.commit()
         db.refresh(new_dept)
-        logger.info(f"Created new department: {new_dept.name}")
+        logger.info("Created new department: %s", new_dept.name)
         return jsonify(DepartmentSchema.from_orm(new_dept).model_dump()), 201
     except Exception as e:
         db.rollback()
-        logger.error(f"Error creating department: {e}", exc_info=True)
+        logger.error("Error creating department: %s", e, exc_info=True)
         return jsonify({"message": f"Internal server error: {str(e)}"}), 500
     finally:
         db.close()
@@ -97,11 +97,11 @@ def delete_department(dept_id):
             return jsonify({"message": "Cannot delete department: It is assigned to one or more users."}), 400
         db.delete(dept)
         db.commit()
-        logger.info(f"Deleted department: {dept.name}")
+        logger.info("Deleted department: %s", dept.name)
         return jsonify({"message": "Department deleted."}), 200
     except Exception as e:
         db.rollback()
-        logger.error(f"Error deleting department: {e}", exc_info=True)
+        logger.error("Error deleting department: %s", e, exc_info=True)
         return jsonify({"message": f"Internal server error: {str(e)}"}), 500
     finally:
         db.close()
@@ -0,0 +1,14 @@
+from flask import Blueprint, jsonify
+from backend.utils.paseto_utils import paseto_required
+from backend.utils.jobs import job_registry
+
+job_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+# --- Background Job Status ---
+@job_bp.route('/<job_id>', methods=['GET'])
+@paseto_required()
+def get_job_status(job_id):
+    job = job_registry.get(job_id)
+    if not job:
+        return jsonify({"detail": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
@@ -0,0 +1,91 @@
+from flask import Blueprint, request, jsonify
+from datetime import datetime
+from sqlalchemy.orm import Session
+from backend.database import SessionLocal
+from backend.models import Period
+from backend.utils.paseto_utils import paseto_required
+from backend.utils.periods import get_current_period, parse_period_date
+from backend.scripts.period_rollover import rollover_period
+from backend.scripts.archive_periods import archive_period
+from backend.utils.jobs import job_registry
+
+period_bp = Blueprint('periods', __name__, url_prefix='/api/periods')
+
+def _period_to_dict(period):
+    return {
+        "id": period.id,
+        "name": period.name,
+        "start_date": period.start_date.isoformat() if period.start_date else None,
+        "end_date": period.end_date.isoformat() if period.end_date else None,
+    }
+
+# --- List Periods ---
+@period_bp.route('', methods=['GET'])
+@paseto_required()
+def get_periods():
+    db: Session = SessionLocal()
+    try:
+        periods = db.query(Period).order_by(Period.start_date.desc(), Period.id.desc()).all()
+        current = get_current_period(db)
+        return jsonify({
+            "current_period_id": current.id if current else None,
+            "periods": [_period_to_dict(p) for p in periods]
+        }), 200
+    finally:
+        db.close()
+
+# --- Roll Over Into a New Period ---
+@period_bp.route('/rollover', methods=['POST'])
+@paseto_required()
+def api_rollover_period():
+    data = request.get_json() or {}
+    name = (data.get('name') or '').strip()
+    if not name:
+        return jsonify({"detail": "Period name is required"}), 400
+
+    try:
+        start_date = parse_period_date(data.get('start_date'))
+        end_date = parse_period_date(data.get('end_date'))
+    except ValueError:
+        return jsonify({"detail": "Invalid date format. Expected ISO string."}), 400
+    if start_date and end_date and end_date < start_date:
+        return jsonify({"detail": "end_date must be after start_date"}), 400
+
+    db: Session = SessionLocal()
+    try:
+        source_period_id = data.get('source_period_id')
+        if not source_period_id:
+            current = get_current_period(db)
+            if not current:
+                return jsonify({"detail": "No source period to roll over from"}), 400
+            source_period_id = current.id
+
+        result = rollover_period(source_period_id, name, start_date, end_date, db=db)
+        return jsonify({"message": f"Period '{name}' created.", **result}), 201
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 404
+    except Exception as e:
+        return jsonify({"detail": f"Error: {str(e)}"}), 500
+    finally:
+        db.close()
+
+# --- Archive a Closed Period ---
+@period_bp.route('/<int:period_id>/archive', methods=['POST'])
+@paseto_required()
+def api_archive_period(period_id):
+    db: Session = SessionLocal()
+    try:
+        period = db.query(Period).filter(Period.id == period_id).first()
+        if not period:
+            return jsonify({"detail": "Period not found"}), 404
+        if not period.end_date or period.end_date >= datetime.now():
+            return jsonify({"detail": "Only closed periods can be archived"}), 400
+    finally:
+        db.close()
+
+    job = job_registry.submit(f'archive-period-{period_id}', archive_period, period_id)
+    return jsonify({
+        "message": f"Archiving period {period_id} started.",
+        "job_id": job.id,
+        "status_url": f"/api/jobs/{job.id}"
+    }), 202
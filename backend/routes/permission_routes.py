@@ -11,6 +11,11 @@ from datetime import timezone
 from backend.utils.paseto_utils import paseto_required, get_paseto_identity
 # Import get_frontend_role from security.py (where it's defined)
 from backend.security import get_frontend_role
+from backend.utils.response_cache import invalidate_dashboards
+from backend.utils.events import publish_event
+import logging
+
+logger = logging.getLogger(__name__)
 
 permission_bp = Blueprint('permission_bp', __name__, url_prefix='/api')
 
@@ -67,7 +72,7 @@ def set_permissions():
     try:
         db.query(Permission).delete()
         db.commit()
-        print("Existing permissions wiped from DB.")
+        logger.debug("Existing permissions wiped from DB.")
 
         new_permission_objects = []
         for pair in allowed_pairs:
@@ -76,18 +81,18 @@ def set_permissions():
             can_survey_self = pair.get('can_survey_self', False)
 
             if from_dept_id is None or to_dept_id is None:
-                print(f"Skipping permission: Invalid pair format - from_dept_id or to_dept_id missing. Pair: {pair}")
+                logger.warning("Skipping permission: Invalid pair format - from_dept_id or to_dept_id missing. Pair: %s", pair)
                 continue
 
             from_dept_exists = db.query(Department).filter_by(id=from_dept_id).first()
             to_dept_exists = db.query(Department).filter_by(id=to_dept_id).first()
 
             if not from_dept_exists or not to_dept_exists:
-                print(f"Skipping permission: Department not found. From ID: {from_dept_id}, To ID: {to_dept_id}. Pair: {pair}")
+                logger.warning("Skipping permission: Department not found. From ID: %s, To ID: %s. Pair: %s", from_dept_id, to_dept_id, pair)
                 continue
 
             if from_dept_id == to_dept_id and not can_survey_self:
-                print(f"Skipping self-survey for department {from_dept_id} as can_survey_self is false.")
+                logger.debug("Skipping self-survey for department %s as can_survey_self is false.", from_dept_id)
                 continue
 
             new_permission_objects.append(
@@ -102,16 +107,18 @@ def set_permissions():
         
         db.add_all(new_permission_objects)
         db.commit()
-        print(f"Saved {len(new_permission_objects)} new permission entries.")
+        invalidate_dashboards()
+        publish_event('permissions', pairs=len(new_permission_objects))
+        logger.info("Saved %s new permission entries.", len(new_permission_objects))
         return jsonify({"message": "Permissions saved successfully"}), 200
 
     except IntegrityError as e:
         db.rollback()
-        print(f"Integrity error during permission setting: {e}")
+        logger.error("Integrity error during permission setting: %s", e)
         return jsonify({"message": f"Database error: {str(e)}"}), 500
     except Exception as e:
         db.rollback()
-        print(f"Error setting permissions: {e}")
+        logger.error("Error setting permissions: %s", e, exc_info=True)
         return jsonify({"message": f"An unexpected error occurred: {str(e)}"}), 500
     finally:
         db.close()
@@ -149,7 +156,7 @@ def mail_alert_users():
 
     alert_summary = []
     if not users_to_alert:
-        print("No users found in the relevant departments for mail alert.")
+        logger.info("No users found in the relevant departments for mail alert.")
         return jsonify({"message": "Mail alert process initiated. No relevant users found for simulation."}), 200
 
     for user in users_to_alert:
@@ -174,7 +181,7 @@ def mail_alert_users():
                 f"Simulating email to user '{user.username}' ({user.email}) from department '{user.department}'. "
                 f"Can now survey: {', '.join(surveyable_depts_names)}. Survey period: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}."
             )
-            print(alert_summary[-1])
+            logger.info("%s", alert_summary[-1])
 
     return jsonify({
         "message": "Mail alert process initiated (simulated). Check backend logs for details.",
@@ -226,7 +233,7 @@ def get_surveyable_departments():
         return jsonify(surveyable_departments_data), 200
 
     except Exception as e:
-        print(f"Error fetching surveyable departments: {e}")
+        logger.error("Error fetching surveyable departments: %s", e)
         return jsonify({"detail": f"An error occurred fetching surveyable departments: {str(e)}"}), 500
     finally:
         db.close()
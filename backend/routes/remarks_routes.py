@@ -1,54 +1,132 @@
 from flask import Blueprint, request, jsonify
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import or_, update, bindparam
+from types import SimpleNamespace
 from backend.database import SessionLocal
 from backend.models import SurveyResponse, Department, User, Question
 from backend.utils.paseto_utils import paseto_required, get_paseto_identity
+from backend.utils.response_cache import invalidate_dashboards
+from backend.utils.events import publish_event
+from backend.utils.counters import feedback_flags, apply_feedback_change, apply_feedback_changes
+from backend.utils.periods import parse_period_date
+from backend.utils.search_index import search_index
+from backend.utils.action_plans import resolve_alerts
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 remarks_bp = Blueprint('remarks', __name__, url_prefix='/api/remarks')
 
+MAX_LIMIT = 2000
+MAX_BULK_ITEMS = 200
+
+FromDepartment = aliased(Department, name='from_department')
+ToDepartment = aliased(Department, name='to_department')
+
+def _feedback_query(db):
+    """Low-rating feedback rows with both department names and the question category, in one query."""
+    return (
+        db.query(
+            SurveyResponse,
+            FromDepartment.name.label('from_department'),
+            ToDepartment.name.label('to_department'),
+            Question.category.label('category')
+        )
+        .outerjoin(FromDepartment, FromDepartment.id == SurveyResponse.from_department_id)
+        .outerjoin(ToDepartment, ToDepartment.id == SurveyResponse.to_department_id)
+        .outerjoin(Question, Question.id == SurveyResponse.question_id)
+        .filter(SurveyResponse.rating.in_([1, 2]))
+    )
+
+def _flag(name):
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    return value.lower() in ('1', 'true', 'yes')
+
+def _apply_list_options(query, sort_columns, default_sort):
+    """
+    Shared filters and paging from the query string: category, acknowledged,
+    since / until (ISO dates on submitted_at), sort, order, limit and offset.
+    Without a limit every matching row is returned. Raises ValueError for
+    invalid values.
+    """
+    category = request.args.get('category')
+    if category:
+        query = query.filter(Question.category == category)
+
+    acknowledged = _flag('acknowledged')
+    if acknowledged is True:
+        query = query.filter(SurveyResponse.acknowledged == True)
+    elif acknowledged is False:
+        query = query.filter(or_(SurveyResponse.acknowledged == False, SurveyResponse.acknowledged == None))
+
+    try:
+        since = parse_period_date(request.args.get('since'))
+        until = parse_period_date(request.args.get('until'))
+    except ValueError:
+        raise ValueError("Invalid 'since' or 'until' date. Expected ISO string.")
+    if since:
+        query = query.filter(SurveyResponse.submitted_at >= since)
+    if until:
+        query = query.filter(SurveyResponse.submitted_at <= until)
+
+    sort = request.args.get('sort', default_sort)
+    if sort not in sort_columns:
+        raise ValueError(f"Invalid sort '{sort}'. Expected one of: {', '.join(sorted(sort_columns))}")
+    column = sort_columns[sort]
+    direction = request.args.get('order', 'desc').lower()
+    query = query.order_by(column.asc() if direction == 'asc' else column.desc(), SurveyResponse.id)
+
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        query = query.limit(min(max(limit, 1), MAX_LIMIT))
+    offset = request.args.get('offset', type=int)
+    if offset:
+        query = query.offset(max(offset, 0))
+    return query
+
+def _user_department_id(db):
+    username = get_paseto_identity()
+    user = db.query(User).filter(User.username == username).first()
+    return user.department_id if user else None
+
 # --- Get Incoming Feedback ---
 @remarks_bp.route('/incoming', methods=['GET'])
 @paseto_required()
 def get_incoming_feedback():
     db: Session = SessionLocal()
     try:
-        username = get_paseto_identity()
-        user = db.query(User).filter(User.username == username).first()
-        if not user or not user.department_id:
-            return jsonify([])
-
-        user_dept = db.query(Department).filter(Department.id == user.department_id).first()
-        if not user_dept:
+        department_id = _user_department_id(db)
+        if not department_id:
             return jsonify([])
 
-        feedbacks = db.query(SurveyResponse).filter(
-            SurveyResponse.to_department_id == user_dept.id,
-            SurveyResponse.rating.in_([1, 2]),
+        query = _feedback_query(db).filter(
+            SurveyResponse.to_department_id == department_id,
             (SurveyResponse.explanation == None) | (SurveyResponse.explanation == '')
-        ).all()
-
-        # DEBUG: Print what is fetched from DB
-        print("INCOMING FEEDBACKS:", [f"{fb.id=} {fb.from_department_id=} {fb.to_department_id=} {fb.rating=} {fb.remark=} {fb.explanation=}" for fb in feedbacks])
-
-        result = []
-        for fb in feedbacks:
-            from_dept = db.query(Department).filter(Department.id == fb.from_department_id).first()
-            category = None
-            if fb.question_id:
-                question = db.query(Question).filter(Question.id == fb.question_id).first()
-                category = question.category if question else None
-            result.append({
+        )
+        from_department_id = request.args.get('department_id', type=int)
+        if from_department_id:
+            query = query.filter(SurveyResponse.from_department_id == from_department_id)
+        try:
+            query = _apply_list_options(query, {
+                "submitted_at": SurveyResponse.submitted_at,
+                "rating": SurveyResponse.rating,
+                "department": FromDepartment.name,
+            }, default_sort="submitted_at")
+        except ValueError as e:
+            return jsonify({"detail": str(e)}), 400
+
+        return jsonify([
+            {
                 "id": fb.id,
-                "fromDepartment": from_dept.name if from_dept else "Unknown",
+                "fromDepartment": from_department or "Unknown",
                 "ratingGiven": fb.rating,
                 "remark": fb.remark,
                 "category": category
-            })
-        return jsonify(result)
+            }
+            for fb, from_department, _, category in query.all()
+        ])
     finally:
         db.close()
 
@@ -69,12 +147,22 @@ def submit_feedback_response():
         if not feedback:
             return jsonify({"detail": "Feedback not found"}), 404
 
+        before = feedback_flags(feedback)
         feedback.explanation = explanation
         feedback.action_plan = action_plan
         feedback.responsible_person = responsible_person
         if target_date:
             feedback.target_date = target_date  # <-- Save to DB
+        apply_feedback_change(db, feedback, before)
         db.commit()
+        search_index.index_response(db, feedback.id)
+        invalidate_dashboards(department_id=feedback.to_department_id)
+        publish_event(
+            'feedback_response',
+            id=feedback.id,
+            from_department_id=feedback.from_department_id,
+            to_department_id=feedback.to_department_id
+        )
         return jsonify({"message": "Response submitted successfully"})
     finally:
         db.close()
@@ -85,36 +173,35 @@ def submit_feedback_response():
 def get_outgoing_feedback():
     db: Session = SessionLocal()
     try:
-        username = get_paseto_identity()
-        user = db.query(User).filter(User.username == username).first()
-        if not user or not user.department_id:
-            return jsonify([])
-
-        user_dept = db.query(Department).filter(Department.id == user.department_id).first()
-        if not user_dept:
+        department_id = _user_department_id(db)
+        if not department_id:
             return jsonify([])
 
-        feedbacks = db.query(SurveyResponse).filter(
-            SurveyResponse.from_department_id == user_dept.id,
-            SurveyResponse.rating.in_([1, 2]),
+        query = _feedback_query(db).filter(
+            SurveyResponse.from_department_id == department_id,
             SurveyResponse.explanation != None,
-            SurveyResponse.explanation != '',
-            SurveyResponse.acknowledged == False  # Only show unacknowledged
-        ).all()
-
-        # DEBUG: Print what is fetched from DB
-        print("OUTGOING FEEDBACKS:", [f"{fb.id=} {fb.from_department_id=} {fb.to_department_id=} {fb.rating=} {fb.remark=} {fb.explanation=}" for fb in feedbacks])
-
-        result = []
-        for fb in feedbacks:
-            to_dept = db.query(Department).filter(Department.id == fb.to_department_id).first()
-            category = None
-            if fb.question_id:
-                question = db.query(Question).filter(Question.id == fb.question_id).first()
-                category = question.category if question else None
-            result.append({
+            SurveyResponse.explanation != ''
+        )
+        # Only unacknowledged responses unless the caller asks otherwise
+        if _flag('acknowledged') is None:
+            query = query.filter(or_(SurveyResponse.acknowledged == False, SurveyResponse.acknowledged == None))
+        to_department_id = request.args.get('department_id', type=int)
+        if to_department_id:
+            query = query.filter(SurveyResponse.to_department_id == to_department_id)
+        try:
+            query = _apply_list_options(query, {
+                "submitted_at": SurveyResponse.submitted_at,
+                "rating": SurveyResponse.rating,
+                "department": ToDepartment.name,
+                "target_date": SurveyResponse.target_date,
+            }, default_sort="submitted_at")
+        except ValueError as e:
+            return jsonify({"detail": str(e)}), 400
+
+        return jsonify([
+            {
                 "id": fb.id,
-                "department": to_dept.name if to_dept else "Unknown",
+                "department": to_department or "Unknown",
                 "rating": fb.rating,
                 "yourRemark": fb.remark,
                 "category": category,
@@ -124,9 +211,10 @@ def get_outgoing_feedback():
                     "responsiblePerson": fb.responsible_person
                 },
                 "acknowledged": bool(fb.acknowledged),
-                "target_date": fb.target_date  # <-- Add this line if not present
-            })
-        return jsonify(result)
+                "target_date": fb.target_date
+            }
+            for fb, _, to_department, category in query.all()
+        ])
     finally:
         db.close()
 
@@ -142,38 +230,249 @@ def acknowledge_feedback():
         if not feedback:
             return jsonify({"detail": "Feedback not found"}), 404
 
+        before = feedback_flags(feedback)
         feedback.acknowledged = True
+        apply_feedback_change(db, feedback, before)
+        resolve_alerts(db, [feedback.id])
         db.commit()
+        invalidate_dashboards(department_id=feedback.from_department_id)
+        publish_event(
+            'acknowledgement',
+            id=feedback.id,
+            from_department_id=feedback.from_department_id,
+            to_department_id=feedback.to_department_id
+        )
         return jsonify({"message": "Feedback acknowledged"})
     finally:
         db.close()
 
+def _bulk_items(key):
+    """Items of a bulk request body: a JSON list, or {key: [...]}."""
+    data = request.get_json(silent=True)
+    items = data.get(key) if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        raise ValueError(f"Expected a non-empty list of {key}.")
+    if len(items) > MAX_BULK_ITEMS:
+        raise ValueError(f"At most {MAX_BULK_ITEMS} {key} per request.")
+    return items
+
+def _is_id(value):
+    # bool is an int subclass; true / false are not feedback ids
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _load_owned_feedback(db, ids):
+    """The feedback rows for `ids` in one query, keyed by id."""
+    rows = db.query(
+        SurveyResponse.id,
+        SurveyResponse.from_department_id,
+        SurveyResponse.to_department_id,
+        SurveyResponse.rating,
+        SurveyResponse.explanation,
+        SurveyResponse.acknowledged
+    ).filter(SurveyResponse.id.in_(ids)).all()
+    return {row.id: row for row in rows}
+
+# --- Respond to Several Incoming Feedback Items at Once ---
+@remarks_bp.route('/respond/bulk', methods=['POST'])
+@paseto_required()
+def bulk_submit_feedback_responses():
+    db: Session = SessionLocal()
+    try:
+        try:
+            items = _bulk_items('items')
+        except ValueError as e:
+            return jsonify({"detail": str(e)}), 400
+        department_id = _user_department_id(db)
+        if not department_id:
+            return jsonify({"detail": "User's department not found"}), 404
+
+        ids = [item.get('id') for item in items if isinstance(item, dict) and _is_id(item.get('id'))]
+        owned = _load_owned_feedback(db, ids) if ids else {}
+
+        results, updates, changes = [], [], []
+        seen = set()
+        for item in items:
+            feedback_id = item.get('id') if isinstance(item, dict) else None
+            row = owned.get(feedback_id) if _is_id(feedback_id) else None
+            if row is None:
+                results.append({"id": feedback_id, "status": "not_found"})
+                continue
+            if row.to_department_id != department_id:
+                results.append({"id": feedback_id, "status": "forbidden"})
+                continue
+            if feedback_id in seen:
+                results.append({"id": feedback_id, "status": "duplicate"})
+                continue
+            explanation = item.get('explanation')
+            if not explanation:
+                results.append({"id": feedback_id, "status": "invalid", "detail": "explanation is required"})
+                continue
+            try:
+                target_date = parse_period_date(item.get('target_date'))
+            except ValueError:
+                results.append({"id": feedback_id, "status": "invalid", "detail": "Invalid target_date"})
+                continue
+
+            seen.add(feedback_id)
+            updates.append({
+                "feedback_id": feedback_id,
+                "explanation": explanation,
+                "action_plan": item.get('action_plan'),
+                "responsible_person": item.get('responsible_person'),
+                "target_date": target_date,
+            })
+            after = SimpleNamespace(
+                id=feedback_id,
+                rating=row.rating,
+                explanation=explanation,
+                acknowledged=row.acknowledged,
+                from_department_id=row.from_department_id,
+                to_department_id=row.to_department_id
+            )
+            changes.append((after, feedback_flags(row)))
+            results.append({"id": feedback_id, "status": "updated"})
+
+        if updates:
+            table = SurveyResponse.__table__
+            columns = ('explanation', 'action_plan', 'responsible_person')
+            # Items without a target_date keep the stored one, so they go in a separate executemany
+            for with_target in (True, False):
+                batch = [u for u in updates if (u["target_date"] is not None) == with_target]
+                if not batch:
+                    continue
+                values = {column: bindparam(column) for column in columns}
+                if with_target:
+                    values["target_date"] = bindparam("target_date")
+                else:
+                    batch = [{k: v for k, v in u.items() if k != "target_date"} for u in batch]
+                db.execute(update(table).where(table.c.id == bindparam('feedback_id')).values(**values), batch)
+            apply_feedback_changes(db, changes)
+            db.commit()
+
+            updated_ids = [u["feedback_id"] for u in updates]
+            search_index.index_responses(db, updated_ids)
+            for to_department_id in {after.to_department_id for after, _ in changes}:
+                invalidate_dashboards(department_id=to_department_id)
+            for after, _ in changes:
+                publish_event(
+                    'feedback_response',
+                    id=after.id,
+                    from_department_id=after.from_department_id,
+                    to_department_id=after.to_department_id
+                )
+
+        return jsonify({"updated": len(updates), "results": results}), 200
+    except Exception as e:
+        db.rollback()
+        return jsonify({"detail": f"Error: {str(e)}"}), 500
+    finally:
+        db.close()
+
+# --- Acknowledge Several Outgoing Feedback Items at Once ---
+@remarks_bp.route('/acknowledge/bulk', methods=['POST'])
+@paseto_required()
+def bulk_acknowledge_feedback():
+    db: Session = SessionLocal()
+    try:
+        try:
+            ids = _bulk_items('ids')
+        except ValueError as e:
+            return jsonify({"detail": str(e)}), 400
+        department_id = _user_department_id(db)
+        if not department_id:
+            return jsonify({"detail": "User's department not found"}), 404
+
+        owned = _load_owned_feedback(db, [i for i in ids if _is_id(i)])
+
+        results, acknowledged, changes = [], [], []
+        for feedback_id in ids:
+            row = owned.get(feedback_id) if _is_id(feedback_id) else None
+            if row is None:
+                results.append({"id": feedback_id, "status": "not_found"})
+            elif row.from_department_id != department_id:
+                results.append({"id": feedback_id, "status": "forbidden"})
+            elif row.acknowledged or feedback_id in acknowledged:
+                results.append({"id": feedback_id, "status": "unchanged"})
+            else:
+                acknowledged.append(feedback_id)
+                after = SimpleNamespace(
+                    id=feedback_id,
+                    rating=row.rating,
+                    explanation=row.explanation,
+                    acknowledged=True,
+                    from_department_id=row.from_department_id,
+                    to_department_id=row.to_department_id
+                )
+                changes.append((after, feedback_flags(row)))
+                results.append({"id": feedback_id, "status": "acknowledged"})
+
+        if acknowledged:
+            table = SurveyResponse.__table__
+            db.execute(
+                update(table).where(table.c.id == bindparam('feedback_id')).values(acknowledged=True),
+                [{"feedback_id": feedback_id} for feedback_id in acknowledged]
+            )
+            apply_feedback_changes(db, changes)
+            resolve_alerts(db, acknowledged)
+            db.commit()
+
+            for from_department_id in {after.from_department_id for after, _ in changes}:
+                invalidate_dashboards(department_id=from_department_id)
+            for after, _ in changes:
+                publish_event(
+                    'acknowledgement',
+                    id=after.id,
+                    from_department_id=after.from_department_id,
+                    to_department_id=after.to_department_id
+                )
+
+        return jsonify({"acknowledged": len(acknowledged), "results": results}), 200
+    except Exception as e:
+        db.rollback()
+        return jsonify({"detail": f"Error: {str(e)}"}), 500
+    finally:
+        db.close()
+
 # --- Customer Focus Data ---
 @remarks_bp.route('/customer-focus', methods=['GET'])
 @paseto_required()  # Or use a separate admin check if needed
 def get_customer_focus_data():
     db: Session = SessionLocal()
     try:
-        responses = db.query(SurveyResponse).filter(
-            SurveyResponse.rating.in_([1, 2]),
+        query = _feedback_query(db).filter(
             SurveyResponse.remark != None,
             SurveyResponse.remark != ''
-        ).all()
-        result = []
-        for resp in responses:
-            to_dept = db.query(Department).filter(Department.id == resp.to_department_id).first()
-            from_dept = db.query(Department).filter(Department.id == resp.from_department_id).first()
-            result.append({
+        )
+        from_department_id = request.args.get('from_department_id', type=int)
+        if from_department_id:
+            query = query.filter(SurveyResponse.from_department_id == from_department_id)
+        to_department_id = request.args.get('to_department_id', type=int)
+        if to_department_id:
+            query = query.filter(SurveyResponse.to_department_id == to_department_id)
+        try:
+            query = _apply_list_options(query, {
+                "submitted_at": SurveyResponse.submitted_at,
+                "target_date": SurveyResponse.target_date,
+                "from_department": FromDepartment.name,
+                "to_department": ToDepartment.name,
+            }, default_sort="submitted_at")
+        except ValueError as e:
+            return jsonify({"detail": str(e)}), 400
+
+        return jsonify([
+            {
                 "id": resp.id,
                 "survey_date": resp.submitted_at.strftime('%d.%m.%Y') if resp.submitted_at else "",
-                "toDepartment": to_dept.name if to_dept else "",
-                "fromDepartment": from_dept.name if from_dept else "",
+                "toDepartment": to_department or "",
+                "fromDepartment": from_department or "",
+                "category": category,
                 "remark": resp.remark,
                 "action_plan": resp.action_plan,
                 "responsible_person": resp.responsible_person,
                 "target_date": resp.target_date.strftime('%d.%m.%Y') if resp.target_date else "",
                 "acknowledged": bool(resp.acknowledged),
-            })
-        return jsonify(result)
+            }
+            for resp, from_department, to_department, category in query.all()
+        ])
     finally:
         db.close()
@@ -0,0 +1,42 @@
+from flask import Blueprint, request, jsonify
+from backend.utils.paseto_utils import paseto_required
+from backend.utils.search_index import search_index, KIND_RESPONSE, KIND_SUBMISSION
+from backend.utils.jobs import job_registry
+
+search_bp = Blueprint('search', __name__, url_prefix='/api/search')
+
+# --- Search Feedback Text ---
+@search_bp.route('', methods=['GET'])
+@paseto_required()
+def search_feedback():
+    kind = request.args.get('kind')
+    if kind not in (None, KIND_RESPONSE, KIND_SUBMISSION):
+        return jsonify({"detail": f"Invalid kind '{kind}'. Expected '{KIND_RESPONSE}' or '{KIND_SUBMISSION}'."}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    page_size = min(max(request.args.get('page_size', 20, type=int), 1), 100)
+
+    found = search_index.search(
+        request.args.get('q', ''),
+        department_id=request.args.get('department_id', type=int),
+        from_department_id=request.args.get('from_department_id', type=int),
+        period_id=request.args.get('period', type=int),
+        category=request.args.get('category') or None,
+        kind=kind,
+        any_term=request.args.get('mode') == 'any',
+        page=page,
+        page_size=page_size
+    )
+    if found is None:
+        return jsonify({"detail": "Query 'q' must contain at least one word."}), 400
+    return jsonify({"page": page, "page_size": page_size, **found}), 200
+
+# --- Rebuild the Search Index From the Database ---
+@search_bp.route('/rebuild', methods=['POST'])
+@paseto_required()
+def rebuild_search_index():
+    job = job_registry.submit('rebuild_search_index', search_index.rebuild)
+    return jsonify({
+        "message": "Search index rebuild started.",
+        "job_id": job.id,
+        "status_url": f"/api/jobs/{job.id}"
+    }), 202
@@ -7,9 +7,18 @@ from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta, timezone
 
 from backend.utils.paseto_utils import paseto_required, get_paseto_identity
+from backend.utils.jobs import job_registry
+from backend.utils.periods import get_current_period
+from backend.utils.rating_vectors import encode_rating_vector
+from backend.utils.dashboard_snapshot import record_submission, invalidate_snapshot
+from backend.utils.response_cache import invalidate_dashboards
+from backend.utils.events import publish_event
+from backend.utils.period_ratings import record_period_rating
+from backend.utils.leaderboard import leaderboard
+from backend.utils.counters import adjust_counters, reset_counters
+from backend.utils.search_index import search_index
 from backend.scripts.populate_surveys_from_permissions import populate_surveys_from_permissions
-from backend.scripts.populate_question_options import populate_question_options_for_ratings
-from backend.scripts.populate_questions_for_surveys import populate_questions_for_all_surveys
+from backend.scripts.provision_surveys import provision_questions, provision_rating_options, provision_all
 from backend.scripts.populate_survey_responses import calculate_overall_rating
 
 survey_bp = Blueprint('survey', __name__, url_prefix='/api')
@@ -59,10 +68,15 @@ def get_assigned_surveys():
             return jsonify([])
 
         # --- FIX: Only show surveys managed by the user's department ---
-        surveys = db.query(Survey).filter(
+        surveys_query = db.query(Survey).filter(
             Survey.rated_department_id.in_(allowed_dept_ids),
             Survey.managing_department_id == user_dept.id
-        ).all()
+        )
+        # Only the current cycle's surveys; earlier periods keep their own copies
+        current_period = get_current_period(db)
+        if current_period:
+            surveys_query = surveys_query.filter(Survey.period_id == current_period.id)
+        surveys = surveys_query.all()
         # -------------------------------------------------------------
 
         return jsonify([
@@ -203,6 +217,12 @@ def submit_survey_response(survey_id):
         import json
         answers_by_category_json = json.dumps(answers_by_category)
 
+        # Packed template-order ratings for analytics scans
+        order_by_question_id = {q.id: q.order for q in questions}
+        rating_vector = encode_rating_vector({
+            order_by_question_id[answer['id']]: answer['rating'] for answer in answers
+        })
+
         # --- Only remove draft and its answers ONCE, before inserting new submission ---
         draft = db.query(SurveySubmission).filter(
             SurveySubmission.survey_id == survey_id,
@@ -214,6 +234,13 @@ def submit_survey_response(survey_id):
             db.delete(draft)
             db.flush()  # Keep transaction atomic
 
+        # Whether this clears the survey from the department's pending badge
+        department_already_submitted = db.query(SurveySubmission.id).filter(
+            SurveySubmission.survey_id == survey.id,
+            SurveySubmission.submitter_department_id == user_dept.id,
+            SurveySubmission.status != 'Draft'
+        ).first() is not None
+
         # Now insert the new submission
         submission = SurveySubmission(
             survey_id=survey.id,
@@ -222,6 +249,7 @@ def submit_survey_response(survey_id):
             rated_department_id=survey.rated_department_id,
             suggestions=suggestion,
             answers_by_category=answers_by_category_json,
+            rating_vector=rating_vector,
             submitted_at=datetime.now(timezone.utc),
             status='Submitted'
         )
@@ -257,8 +285,8 @@ def submit_survey_response(survey_id):
 
         submission.survey_attendance = attendance
 
-        # Commit after setting attendance to avoid rollback issues
-        db.commit()
+        # Flush only: the submission, its rows and the counter / snapshot deltas commit together below
+        db.flush()
 
         for answer in answers:
             # Find the option ID for this rating
@@ -277,8 +305,10 @@ def submit_survey_response(survey_id):
             ))
 
         # Insert into survey_responses for each low rating with remarks
+        low_rating_count = 0
         for answer in answers:
             if answer.get('rating', 0) in [1, 2] and answer.get('remarks', '').strip():
+                low_rating_count += 1
                 sr = SurveyResponse(
                     survey_id=survey.id,
                     user_id=user.id,
@@ -298,6 +328,7 @@ def submit_survey_response(survey_id):
         db.flush()  # <-- Add this line
 
         # Now calculate overall_rating
+        overall_rating = calculate_overall_rating(db, submission.id)
         summary_sr = SurveyResponse(
             survey_id=survey.id,
             user_id=user.id,
@@ -306,17 +337,44 @@ def submit_survey_response(survey_id):
             to_department_id=survey.rated_department_id,
             submitted_at=submission.submitted_at,
             acknowledged=False,
-            overall_rating=calculate_overall_rating(db, submission.id),
+            overall_rating=overall_rating,
             final_suggestion=suggestion if suggestion else None,
         )
         db.add(summary_sr)
 
         # --- FIX: Update super_overall for the rated department ---
         db.flush()  # Ensure summary_sr is written before calculating average
-        update_super_overall_for_department(db, survey.rated_department_id)
+        department_average = update_super_overall_for_department(db, survey.rated_department_id, commit=False)
         # ---------------------------------------------------------
 
+        record_submission(
+            db,
+            attendance,
+            department_name=survey.rated_department.name if survey.rated_department else None,
+            department_average=department_average
+        )
+        record_period_rating(db, survey.rated_department_id, survey.period_id, overall_rating, rating_vector)
+        adjust_counters(
+            db, user_dept.id, period_id=survey.period_id,
+            pending_surveys=0 if department_already_submitted else -1
+        )
+        adjust_counters(db, survey.rated_department_id, incoming_unanswered=low_rating_count)
+
         db.commit()
+        leaderboard.update_department(db, survey.period_id, survey.rated_department_id)
+        search_index.index_submission(db, submission.id)
+        invalidate_dashboards(department_id=survey.rated_department_id)
+        publish_event(
+            'submission',
+            submitter_department_id=user_dept.id,
+            rated_department_id=survey.rated_department_id,
+            rated_department=survey.rated_department.name if survey.rated_department else None,
+            department_average=round(department_average, 2) if department_average is not None else None,
+            submitted=1,
+            on_time=1 if attendance == 100.0 else 0,
+            late=1 if attendance == 95.0 else 0,
+            pending=0 if department_already_submitted else -1
+        )
         return jsonify({"message": "Survey submitted successfully!"}, 201)
     except IntegrityError:
         db.rollback()
@@ -389,18 +447,28 @@ def create_survey():
         description = data.get('description')
         rated_department_id = data.get('rated_department_id')
         managing_department_id = data.get('managing_department_id')
+        period_id = data.get('period_id')
 
         if not (title and rated_department_id):
             return jsonify({"detail": "Title and rated_department_id are required"}), 400
 
+        if not period_id:
+            period = get_current_period(db)
+            if not period:
+                return jsonify({"detail": "No survey period defined. Create a period first."}), 400
+            period_id = period.id
+
         survey = Survey(
             title=title,
             description=description,
             rated_department_id=rated_department_id,
-            managing_department_id=managing_department_id
+            managing_department_id=managing_department_id,
+            period_id=period_id
         )
         db.add(survey)
         db.commit()
+        invalidate_snapshot(db)
+        reset_counters(db)
         return jsonify({"message": "Survey created", "id": survey.id}), 201
     except Exception as e:
         db.rollback()
@@ -413,11 +481,27 @@ def create_survey():
 @survey_bp.route('/populate-surveys-from-permissions', methods=['POST'])
 @paseto_required()
 def api_populate_surveys_from_permissions():
-    try:
-        created = populate_surveys_from_permissions()
-        return jsonify({"message": f"Populated {created} surveys from permissions."}), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    # Reconciliation runs in the background; poll /api/jobs/<job_id> for progress
+    data = request.get_json(silent=True) or {}
+    period_id = data.get('period_id')
+    if period_id is None:
+        db: Session = SessionLocal()
+        try:
+            current = get_current_period(db)
+            period_id = current.id if current else None
+        finally:
+            db.close()
+    # One job per period: a run for another period is not deduplicated into this one
+    job = job_registry.submit(
+        f'populate-surveys-from-permissions-{period_id}',
+        populate_surveys_from_permissions,
+        period_id=period_id
+    )
+    return jsonify({
+        "message": "Survey population started.",
+        "job_id": job.id,
+        "status_url": f"/api/jobs/{job.id}"
+    }), 202
 
 # --- Save Survey Draft ---
 @survey_bp.route('/surveys/<int:survey_id>/save_draft', methods=['POST'])
@@ -515,13 +599,22 @@ def get_survey_draft(survey_id):
     finally:
         db.close()
 
+def _is_dry_run():
+    return request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+
 # --- Populate Question Options ---
 @survey_bp.route('/populate-question-options', methods=['POST'])
 @paseto_required()
 def api_populate_question_options():
     try:
-        created = populate_question_options_for_ratings()
-        return jsonify({"message": f"Populated options for {created} rating questions."}), 200
+        dry_run = _is_dry_run()
+        result = provision_rating_options(dry_run=dry_run)
+        verb = "Would populate" if dry_run else "Populated"
+        return jsonify({
+            "message": f"{verb} options for {result['questions']} rating questions.",
+            "dry_run": dry_run,
+            **result
+        }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -530,15 +623,34 @@ def api_populate_question_options():
 @paseto_required()
 def api_populate_questions_for_surveys():
     try:
-        created = populate_questions_for_all_surveys()
-        return jsonify({"message": f"Populated questions for {created} surveys."}), 200
+        dry_run = _is_dry_run()
+        result = provision_questions(dry_run=dry_run)
+        verb = "Would populate" if dry_run else "Populated"
+        return jsonify({
+            "message": f"{verb} questions for {result['surveys']} surveys.",
+            "dry_run": dry_run,
+            **result
+        }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# --- Provision Questions and Options (background) ---
+@survey_bp.route('/provision-surveys', methods=['POST'])
+@paseto_required()
+def api_provision_surveys():
+    if _is_dry_run():
+        return jsonify(provision_all(dry_run=True)), 200
+    job = job_registry.submit('provision-surveys', provision_all)
+    return jsonify({
+        "message": "Survey provisioning started.",
+        "job_id": job.id,
+        "status_url": f"/api/jobs/{job.id}"
+    }), 202
+
 from sqlalchemy.orm import Session
 from backend.models import SurveyResponse
 
-def update_super_overall_for_department(db: Session, department_id: int):
+def update_super_overall_for_department(db: Session, department_id: int, commit: bool = True):
     # Calculate the average overall_rating for this department
     avg = db.query(func.avg(SurveyResponse.overall_rating))\
         .filter(SurveyResponse.to_department_id == department_id, SurveyResponse.overall_rating != None)\
@@ -547,4 +659,8 @@ def update_super_overall_for_department(db: Session, department_id: int):
     db.query(SurveyResponse)\
         .filter(SurveyResponse.to_department_id == department_id)\
         .update({SurveyResponse.super_overall: avg}, synchronize_session=False)
-    db.commit()
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+    return avg
@@ -0,0 +1,79 @@
+from backend.database import SessionLocal
+from backend.models import (
+    Period, Survey, SurveySubmission, Answer, SurveyResponse,
+    ArchivedSurveySubmission, ArchivedAnswer, ArchivedSurveyResponse
+)
+from sqlalchemy import select, insert, delete, literal
+from datetime import datetime
+from backend.utils.dashboard_snapshot import invalidate_snapshot
+from backend.utils.counters import reset_counters
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Surveys moved per transaction
+SURVEY_CHUNK_SIZE = 100
+
+def _move_rows(db, hot_model, archive_model, where, period_id):
+    # INSERT ... SELECT into the archive, then delete the same rows from the hot table
+    hot = hot_model.__table__
+    names = [c.name for c in hot.columns]
+    db.execute(insert(archive_model).from_select(
+        names + ['period_id'],
+        select(*[hot.c[name] for name in names], literal(period_id)).where(where)
+    ))
+    return db.execute(delete(hot_model).where(where)).rowcount
+
+def archive_period(period_id, chunk_size=SURVEY_CHUNK_SIZE, report=None):
+    """
+    Moves the submissions, answers and survey responses of a closed period
+    into the *_archive tables, chunked by survey and committed per chunk.
+    Safe to re-run: each run only moves what is still in the hot tables.
+    """
+    db = SessionLocal()
+    try:
+        period = db.query(Period).filter(Period.id == period_id).first()
+        if not period:
+            raise ValueError(f"Period {period_id} not found.")
+        if not period.end_date or period.end_date >= datetime.now():
+            raise ValueError(f"Period '{period.name}' is still open and cannot be archived.")
+
+        survey_ids = db.execute(
+            select(Survey.id).where(Survey.period_id == period_id).order_by(Survey.id)
+        ).scalars().all()
+
+        counts = {"submissions": 0, "answers": 0, "responses": 0}
+        for start in range(0, len(survey_ids), chunk_size):
+            chunk = survey_ids[start:start + chunk_size]
+            submission_ids = select(SurveySubmission.id).where(SurveySubmission.survey_id.in_(chunk))
+
+            # Children first: responses and answers reference submissions
+            counts["responses"] += _move_rows(
+                db, SurveyResponse, ArchivedSurveyResponse, SurveyResponse.survey_id.in_(chunk), period_id
+            )
+            counts["answers"] += _move_rows(
+                db, Answer, ArchivedAnswer, Answer.submission_id.in_(submission_ids), period_id
+            )
+            counts["submissions"] += _move_rows(
+                db, SurveySubmission, ArchivedSurveySubmission, SurveySubmission.survey_id.in_(chunk), period_id
+            )
+            db.commit()
+            if report:
+                done = min(start + chunk_size, len(survey_ids))
+                report(100 * done / len(survey_ids), f"Archived {done} of {len(survey_ids)} surveys")
+
+        invalidate_snapshot(db)
+        # The stored badge counters still count the archived feedback rows
+        reset_counters(db)
+        logger.info("Archived period %s: %s", period_id, counts)
+        return {"period_id": period_id, **counts}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    import sys
+    print(archive_period(int(sys.argv[1])))
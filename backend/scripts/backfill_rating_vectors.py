@@ -0,0 +1,16 @@
+from backend.database import SessionLocal
+from backend.utils.rating_vectors import backfill_rating_vectors
+
+def main():
+    db = SessionLocal()
+    try:
+        updated = backfill_rating_vectors(db)
+        print(f"Backfilled rating vectors for {updated} submissions.")
+    except Exception as e:
+        db.rollback()
+        print(f"Error: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
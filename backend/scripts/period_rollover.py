@@ -0,0 +1,142 @@
+from backend.database import SessionLocal
+from backend.models import Period, Permission, Survey, Question, Option
+from sqlalchemy import select, insert, update, and_, func, literal
+from sqlalchemy.orm import aliased
+from backend.utils.dashboard_snapshot import invalidate_snapshot
+from backend.utils.counters import reset_counters
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _numbered_surveys(period_id, name):
+    """
+    The surveys of a period, numbered by id within their department pair.
+    create_survey allows several surveys per pair, so a clone is matched to its
+    source by (pair, number), never by the pair alone.
+    """
+    # managing_department_id is nullable, so compare through COALESCE
+    managing = func.coalesce(Survey.managing_department_id, 0)
+    return (
+        select(
+            Survey.id,
+            Survey.rated_department_id,
+            managing.label('managing_key'),
+            func.row_number().over(
+                partition_by=(Survey.rated_department_id, managing), order_by=Survey.id
+            ).label('number')
+        )
+        .where(Survey.period_id == period_id)
+        .subquery(name)
+    )
+
+def _same_survey(new_survey, old_survey):
+    return and_(
+        new_survey.c.rated_department_id == old_survey.c.rated_department_id,
+        new_survey.c.managing_key == old_survey.c.managing_key,
+        new_survey.c.number == old_survey.c.number
+    )
+
+def rollover_period(source_period_id, name, start_date=None, end_date=None, db=None):
+    """
+    Opens a new period by cloning the survey structure of `source_period_id`:
+    surveys, their questions and question options are copied with one
+    INSERT ... SELECT each, and the permission matrix is re-dated to the new
+    period window. Attendance grades each period against its own end_date, so
+    a source period without one first gets the window it was run in.
+    Everything runs in a single transaction.
+
+    Returns the new period id and the number of rows created per table.
+    """
+    owns_session = db is None
+    db = db or SessionLocal()
+    try:
+        source = db.query(Period).filter(Period.id == source_period_id).first()
+        if not source:
+            raise ValueError(f"Source period {source_period_id} not found.")
+
+        new_period = Period(name=name, start_date=start_date, end_date=end_date)
+        db.add(new_period)
+        db.flush()
+        new_period_id = new_period.id
+
+        # 1. Permission matrix: pairs are unique (uq_from_to_dept), so the
+        #    matrix carries over as-is and only its survey window moves.
+        permissions_count = 0
+        if start_date or end_date:
+            if source.end_date is None:
+                # Keep the source period's deadline where it was before re-dating
+                source.end_date = db.query(func.max(Permission.end_date)).scalar()
+                db.flush()
+            permissions_count = db.execute(
+                update(Permission).values(
+                    start_date=start_date or Permission.start_date,
+                    end_date=end_date or Permission.end_date
+                )
+            ).rowcount
+
+        # 2. Surveys
+        surveys_count = db.execute(
+            insert(Survey).from_select(
+                ['title', 'description', 'rated_department_id', 'managing_department_id', 'period_id'],
+                select(
+                    Survey.title,
+                    Survey.description,
+                    Survey.rated_department_id,
+                    Survey.managing_department_id,
+                    literal(new_period_id)
+                )
+                .where(Survey.period_id == source_period_id)
+                # Ids are assigned in this order, so clones number like their sources
+                .order_by(Survey.id)
+            )
+        ).rowcount
+
+        # 3. Questions, re-pointed at the clone of their survey
+        old_survey = _numbered_surveys(source_period_id, 'old_survey')
+        new_survey = _numbered_surveys(new_period_id, 'new_survey')
+        questions_count = db.execute(
+            insert(Question).from_select(
+                ['survey_id', 'text', 'type', 'order', 'category'],
+                select(new_survey.c.id, Question.text, Question.type, Question.order, Question.category)
+                .join(old_survey, Question.survey_id == old_survey.c.id)
+                .join(new_survey, _same_survey(new_survey, old_survey))
+            )
+        ).rowcount
+
+        # 4. Options, re-pointed at the cloned question with the same order
+        old_question = aliased(Question)
+        new_question = aliased(Question)
+        options_count = db.execute(
+            insert(Option).from_select(
+                ['question_id', 'text', 'value', 'order'],
+                select(new_question.id, Option.text, Option.value, Option.order)
+                .join(old_question, Option.question_id == old_question.id)
+                .join(old_survey, old_question.survey_id == old_survey.c.id)
+                .join(new_survey, _same_survey(new_survey, old_survey))
+                .join(new_question, and_(
+                    new_question.survey_id == new_survey.c.id,
+                    new_question.order == old_question.order
+                ))
+            )
+        ).rowcount
+
+        db.commit()
+        invalidate_snapshot(db)
+        reset_counters(db)
+        result = {
+            "period_id": new_period_id,
+            "source_period_id": source_period_id,
+            "permissions": permissions_count,
+            "surveys": surveys_count,
+            "questions": questions_count,
+            "options": options_count,
+        }
+        logger.info("Rolled over period %s into new period %s: %s", source_period_id, new_period_id, result)
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if owns_session:
+            db.close()
@@ -1,6 +1,3 @@
-from backend.database import SessionLocal
-from backend.models import Survey, Question
-
 STANDARD_QUESTIONS = [
     ('QUALITY', 'Understands Customer needs', 'rating', 1),
     ('QUALITY', 'Provides 100% quality parts / service / information', 'rating', 2),
@@ -24,26 +21,7 @@ STANDARD_QUESTIONS = [
     ('IMPROVEMENT', 'Facilitates improvements at customer end', 'rating', 20),
 ]
 
-def populate_questions_for_all_surveys():
-    db = SessionLocal()
-    try:
-        surveys = db.query(Survey).all()
-        count = 0
-        for survey in surveys:
-            existing = db.query(Question).filter_by(survey_id=survey.id).count()
-            if existing > 0:
-                continue
-            for cat, text, typ, order in STANDARD_QUESTIONS:
-                q = Question(
-                    survey_id=survey.id,
-                    category=cat,
-                    text=text,
-                    type=typ,
-                    order=order
-                )
-                db.add(q)
-            count += 1
-        db.commit()
-        return count
-    finally:
-        db.close()
\ No newline at end of file
+def populate_questions_for_all_surveys(dry_run=False):
+    # Bulk insert path lives in provision_surveys; kept here for existing callers
+    from backend.scripts.provision_surveys import provision_questions
+    return provision_questions(dry_run=dry_run)["surveys"]
@@ -1,54 +1,126 @@
-from backend.models import Permission, Survey, Department
+from backend.models import Permission, Survey, Department, Question, Option, SurveySubmission, Answer, SurveyResponse
 from backend.database import SessionLocal
+from backend.utils.periods import get_current_period
+from backend.utils.dashboard_snapshot import invalidate_snapshot
+from backend.utils.counters import reset_counters
+from backend.utils.period_ratings import rebuild_period_ratings
+from sqlalchemy import select, insert, delete, exists, and_, or_
 from datetime import datetime
 
 import logging
 
-def populate_surveys_from_permissions():
+# Keeps IN (...) lists well below the SQL Server 2100 parameter limit
+CHUNK_SIZE = 500
+
+def _chunks(items, size=CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _delete_surveys(db, survey_ids):
+    # Remove everything hanging off these surveys, children first, in set-based statements
+    submission_ids = select(SurveySubmission.id).where(SurveySubmission.survey_id.in_(survey_ids))
+    question_ids = select(Question.id).where(Question.survey_id.in_(survey_ids))
+
+    db.execute(delete(SurveyResponse).where(or_(
+        SurveyResponse.survey_id.in_(survey_ids),
+        SurveyResponse.survey_submission_id.in_(submission_ids),
+        SurveyResponse.question_id.in_(question_ids)
+    )))
+    db.execute(delete(Answer).where(or_(
+        Answer.submission_id.in_(submission_ids),
+        Answer.question_id.in_(question_ids)
+    )))
+    db.execute(delete(Option).where(Option.question_id.in_(question_ids)))
+    db.execute(delete(SurveySubmission).where(SurveySubmission.survey_id.in_(survey_ids)))
+    db.execute(delete(Question).where(Question.survey_id.in_(survey_ids)))
+    db.execute(delete(Survey).where(Survey.id.in_(survey_ids)))
+
+def populate_surveys_from_permissions(period_id=None, report=None):
+    """
+    Reconciles the surveys of a period (the current one by default) with the
+    permission matrix: one survey per (rated department, managing department)
+    permission pair. Stale surveys are deleted in chunks and missing ones are
+    bulk inserted. Surveys of other periods are never touched.
+
+    report: optional progress callback report(percent, message), used when
+    running as a background job.
+    """
+    report = report or (lambda progress, message=None: None)
     db = SessionLocal()
     created_count = 0
     deleted_count = 0
     try:
-        # 1. Get all valid permission pairs
-        permissions = db.query(Permission).all()
-        valid_pairs = set((perm.to_dept_id, perm.from_dept_id) for perm in permissions)
-
-        # 2. Get all existing survey pairs
-        surveys = db.query(Survey).all()
-        survey_pairs = set((survey.rated_department_id, survey.managing_department_id) for survey in surveys)
-
-        # 3. Find surveys to delete (no longer permitted)
-        to_delete = [survey for survey in surveys
-                     if (survey.rated_department_id, survey.managing_department_id) not in valid_pairs]
-        for survey in to_delete:
-            db.delete(survey)
-            deleted_count += 1
-
-        # 4. Add new surveys for new permissions
-        for perm in permissions:
-            pair = (perm.to_dept_id, perm.from_dept_id)
-            if pair not in survey_pairs:
-                rated_dept = db.query(Department).filter(Department.id == perm.to_dept_id).first()
-                managing_dept = db.query(Department).filter(Department.id == perm.from_dept_id).first()
-                survey = Survey(
-                    title=f"Quarterly Survey for {rated_dept.name}",
-                    description=f"Survey for {rated_dept.name} managed by {managing_dept.name}",
-                    created_at=datetime.now(),
-                    rated_department_id=perm.to_dept_id,
-                    managing_department_id=perm.from_dept_id
-                )
-                db.add(survey)
-                created_count += 1
-
-        db.commit()
-        print(f"Surveys populated based on permissions. {created_count} surveys created, {deleted_count} surveys deleted.")
-        return created_count
+        if period_id is None:
+            period = get_current_period(db)
+            if not period:
+                raise ValueError("No survey period defined. Create a period before populating surveys.")
+            period_id = period.id
+
+        # 1. Surveys whose (rated, managing) pair is no longer permitted
+        permitted = exists().where(and_(
+            Permission.to_dept_id == Survey.rated_department_id,
+            Permission.from_dept_id == Survey.managing_department_id
+        ))
+        to_delete = db.execute(
+            select(Survey.id).where(Survey.period_id == period_id, ~permitted)
+        ).scalars().all()
+
+        # 2. Permission pairs that have no survey yet
+        has_survey = exists().where(and_(
+            Survey.rated_department_id == Permission.to_dept_id,
+            Survey.managing_department_id == Permission.from_dept_id,
+            Survey.period_id == period_id
+        ))
+        to_create = db.execute(
+            select(Permission.to_dept_id, Permission.from_dept_id).where(~has_survey)
+        ).all()
+        report(5, f"{len(to_delete)} surveys to delete, {len(to_create)} surveys to create")
+
+        total_steps = max(1, len(to_delete) + len(to_create))
+
+        # 3. Chunked deletes, committed per chunk so locks are held briefly
+        for chunk in _chunks(to_delete):
+            _delete_surveys(db, chunk)
+            db.commit()
+            deleted_count += len(chunk)
+            report(5 + 90 * deleted_count / total_steps, f"Deleted {deleted_count} of {len(to_delete)} surveys")
+
+        # 4. Bulk insert new surveys, department names resolved from one preloaded map
+        if to_create:
+            dept_names = dict(db.execute(select(Department.id, Department.name)).all())
+            now = datetime.now()
+            rows = [
+                {
+                    "title": f"Quarterly Survey for {dept_names.get(rated_id, '')}",
+                    "description": f"Survey for {dept_names.get(rated_id, '')} managed by {dept_names.get(managing_id, '')}",
+                    "created_at": now,
+                    "rated_department_id": rated_id,
+                    "managing_department_id": managing_id,
+                    "period_id": period_id,
+                }
+                for rated_id, managing_id in to_create
+            ]
+            for chunk in _chunks(rows):
+                db.execute(insert(Survey), chunk)
+                db.commit()
+                created_count += len(chunk)
+                report(5 + 90 * (deleted_count + created_count) / total_steps, f"Created {created_count} of {len(rows)} surveys")
+
+        if created_count or deleted_count:
+            invalidate_snapshot(db)
+            reset_counters(db)
+        if deleted_count:
+            # Deleted surveys took their submissions with them
+            rebuild_period_ratings(db, period_id)
+
+        logging.info("Surveys populated based on permissions. %s surveys created, %s surveys deleted.", created_count, deleted_count)
+        return {"period_id": period_id, "created": created_count, "deleted": deleted_count}
     except Exception as e:
         db.rollback()
-        logging.error(f"Error populating surveys from permissions: {e}", exc_info=True)
+        logging.error("Error populating surveys from permissions: %s", e, exc_info=True)
         raise
     finally:
         db.close()
 
 if __name__ == "__main__":
-    populate_surveys_from_permissions()
\ No newline at end of file
+    print(populate_surveys_from_permissions())
@@ -0,0 +1,149 @@
+from backend.database import SessionLocal
+from backend.models import Survey, Question, Option
+from backend.scripts.populate_questions_for_surveys import STANDARD_QUESTIONS
+from sqlalchemy import select, insert, func
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Surveys/questions handled per transaction. Each chunk is committed on its own,
+# so an interrupted run can simply be restarted and picks up where it stopped.
+SURVEY_CHUNK_SIZE = 200
+QUESTION_CHUNK_SIZE = 1000
+
+RATING_OPTIONS = [
+    (value, f"{value} Star{'s' if value > 1 else ''}") for value in range(1, 5)
+]
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def find_unprovisioned_surveys(db):
+    """Ids of surveys that have no questions yet (single grouped anti-join)."""
+    return db.execute(
+        select(Survey.id)
+        .outerjoin(Question, Question.survey_id == Survey.id)
+        .group_by(Survey.id)
+        .having(func.count(Question.id) == 0)
+        .order_by(Survey.id)
+    ).scalars().all()
+
+def find_unprovisioned_rating_questions(db):
+    """(question_id, option_count) for rating questions with fewer than 4 options."""
+    return db.execute(
+        select(Question.id, func.count(Option.id))
+        .outerjoin(Option, Option.question_id == Question.id)
+        .where(Question.type == 'rating')
+        .group_by(Question.id)
+        .having(func.count(Option.id) < len(RATING_OPTIONS))
+        .order_by(Question.id)
+    ).all()
+
+def provision_questions(db=None, dry_run=False, chunk_size=SURVEY_CHUNK_SIZE, report=None):
+    """
+    Creates the standard question set for every survey that has none.
+    Returns {"surveys": <surveys provisioned>, "questions": <rows created>};
+    with dry_run=True nothing is written and the counts are what would be created.
+    """
+    owns_session = db is None
+    db = db or SessionLocal()
+    try:
+        survey_ids = find_unprovisioned_surveys(db)
+        result = {"surveys": len(survey_ids), "questions": len(survey_ids) * len(STANDARD_QUESTIONS)}
+        if dry_run or not survey_ids:
+            return result
+
+        done = 0
+        for chunk in _chunks(survey_ids, chunk_size):
+            rows = [
+                {"survey_id": survey_id, "category": cat, "text": text, "type": typ, "order": order}
+                for survey_id in chunk
+                for cat, text, typ, order in STANDARD_QUESTIONS
+            ]
+            db.execute(insert(Question), rows)
+            db.commit()
+            done += len(chunk)
+            if report:
+                report(100 * done / len(survey_ids), f"Provisioned questions for {done} of {len(survey_ids)} surveys")
+        logger.info("Provisioned %s questions for %s surveys.", result['questions'], result['surveys'])
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if owns_session:
+            db.close()
+
+def provision_rating_options(db=None, dry_run=False, chunk_size=QUESTION_CHUNK_SIZE, report=None):
+    """
+    Creates the 1-4 star options for every rating question missing some of them.
+    Only the missing option orders are inserted, so partially provisioned
+    questions are completed instead of violating uq_question_option_order.
+    Returns {"questions": <questions provisioned>, "options": <rows created>}.
+    """
+    owns_session = db is None
+    db = db or SessionLocal()
+    try:
+        pending = find_unprovisioned_rating_questions(db)
+
+        # Only partially provisioned questions need to know which orders exist already
+        existing_orders = {}
+        partial_ids = [question_id for question_id, option_count in pending if option_count > 0]
+        for chunk in _chunks(partial_ids, QUESTION_CHUNK_SIZE):
+            for question_id, order in db.execute(
+                select(Option.question_id, Option.order).where(Option.question_id.in_(chunk))
+            ):
+                existing_orders.setdefault(question_id, set()).add(order)
+
+        rows = [
+            {"question_id": question_id, "text": text, "value": str(value), "order": value}
+            for question_id, _ in pending
+            for value, text in RATING_OPTIONS
+            if value not in existing_orders.get(question_id, ())
+        ]
+        result = {"questions": len(pending), "options": len(rows)}
+        if dry_run or not rows:
+            return result
+
+        options_per_chunk = chunk_size * len(RATING_OPTIONS)
+        done = 0
+        for chunk in _chunks(rows, options_per_chunk):
+            db.execute(insert(Option), chunk)
+            db.commit()
+            done += len(chunk)
+            if report:
+                report(100 * done / len(rows), f"Created {done} of {len(rows)} rating options")
+        logger.info("Provisioned %s options for %s rating questions.", result['options'], result['questions'])
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if owns_session:
+            db.close()
+
+def provision_all(dry_run=False, report=None):
+    """Questions first, then options for the questions that were just created."""
+    db = SessionLocal()
+    try:
+        questions = provision_questions(db, dry_run=dry_run)
+        if report:
+            report(50, f"Provisioned questions for {questions['surveys']} surveys")
+        options = provision_rating_options(db, dry_run=dry_run)
+        if dry_run:
+            # Questions that do not exist yet will need options too
+            rating_questions = sum(1 for _, _, typ, _ in STANDARD_QUESTIONS if typ == 'rating')
+            extra = questions["surveys"] * rating_questions
+            options = {
+                "questions": options["questions"] + extra,
+                "options": options["options"] + extra * len(RATING_OPTIONS),
+            }
+        return {"dry_run": dry_run, "questions": questions, "options": options}
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    import sys
+    print(provision_all(dry_run="--dry-run" in sys.argv))
@@ -0,0 +1,18 @@
+import sys
+from backend.database import SessionLocal
+from backend.utils.period_ratings import rebuild_period_ratings
+
+def main(period_id=None):
+    db = SessionLocal()
+    try:
+        written = rebuild_period_ratings(db, period_id)
+        scope = f"period {period_id}" if period_id is not None else "all periods"
+        print(f"Rebuilt {written} department rating rollups for {scope}.")
+    except Exception as e:
+        db.rollback()
+        print(f"Error: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
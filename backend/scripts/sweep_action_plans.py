@@ -0,0 +1,15 @@
+from backend.utils.action_plans import sweep_action_plans
+
+def main():
+    # Intended for cron; concurrent runs are serialized by the sweep's own lock
+    try:
+        result = sweep_action_plans()
+        if result.get("skipped"):
+            print("Skipped: another action plan sweep is running.")
+        else:
+            print(f"Swept action plans: {result['overdue']} overdue, {result['due_soon']} due soon.")
+    except Exception as e:
+        print(f"Error: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy.orm import sessionmaker
+from backend.app import app
+from backend.database import engine
+from backend.models import Department, User, Period, Survey, Question, Permission
+from backend.routes import survey_routes
+from backend.utils.paseto_utils import paseto, PASETO_KEY, PASETO_COOKIE_NAME
+
+CATEGORIES = ["QUALITY", "DELIVERY", "COMMUNICATION", "RESPONSIVENESS", "IMPROVEMENT"]
+
+@pytest.fixture
+def db(monkeypatch):
+    # Everything written here and by the request (its commits become savepoints) is rolled back
+    connection = engine.connect()
+    transaction = connection.begin()
+    Session = sessionmaker(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+    monkeypatch.setattr(survey_routes, 'SessionLocal', Session)
+    session = Session()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+@pytest.fixture
+def survey_setup(db):
+    suffix = uuid.uuid4().hex[:8]
+    now = datetime.now(timezone.utc)
+    rater = Department(name=f"Counters Rater {suffix}")
+    rated = Department(name=f"Counters Rated {suffix}")
+    period = Period(name=f"Counters {suffix}", start_date=now - timedelta(days=30), end_date=now + timedelta(days=30))
+    db.add_all([rater, rated, period])
+    db.flush()
+    user = User(
+        username=f"counters_{suffix}", name="Counters Test", email=f"counters_{suffix}@example.com",
+        department=rater.name, department_id=rater.id, hashed_password="x"
+    )
+    survey = Survey(
+        title=f"Counters {suffix}", rated_department_id=rated.id,
+        managing_department_id=rater.id, period_id=period.id
+    )
+    db.add_all([user, survey, Permission(
+        from_dept_id=rater.id, to_dept_id=rated.id,
+        start_date=now - timedelta(days=1), end_date=now + timedelta(days=1)
+    )])
+    db.flush()
+    db.add_all([
+        Question(survey_id=survey.id, text=f"Question {i}", type='rating', order=i, category=category)
+        for i, category in enumerate(CATEGORIES, 1)
+    ])
+    db.commit()
+    return user, survey, rater, rated
+
+@pytest.fixture
+def client_for():
+    return _client_for
+
+def _client_for(username):
+    token = paseto.encode(PASETO_KEY, json.dumps({
+        "identity": username,
+        "exp": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+    }))
+    client = app.test_client()
+    client.set_cookie(PASETO_COOKIE_NAME, token.decode() if isinstance(token, bytes) else token)
+    return client
+
+@pytest.fixture
+def submission_answers():
+    def answers(db, survey):
+        questions = db.query(Question).filter(Question.survey_id == survey.id).order_by(Question.order).all()
+        return [
+            {"id": q.id, "rating": 1 if i < 2 else 4, "remarks": "Needs work" if i < 2 else ""}
+            for i, q in enumerate(questions)
+        ]
+    return answers
@@ -0,0 +1,38 @@
+from backend.models import DepartmentCounters, SurveySubmission
+from backend.routes import survey_routes
+from backend.utils.counters import get_counters, compute_counters, COUNTER_FIELDS
+
+def test_submission_keeps_counters_equal_to_recompute(db, survey_setup, client_for, submission_answers):
+    user, survey, rater, rated = survey_setup
+    # Materialize both rows so the submission has to apply its deltas to them
+    for department in (rater, rated):
+        get_counters(db, department.id, refresh=True)
+
+    response = client_for(user.username).post(
+        f'/api/surveys/{survey.id}/submit_response', json={"answers": submission_answers(db, survey)}
+    )
+    assert response.status_code == 200
+
+    db.expire_all()
+    for department in (rater, rated):
+        stored = db.get(DepartmentCounters, department.id)
+        expected = compute_counters(db, department.id, stored.period_id)
+        assert {field: getattr(stored, field) for field in COUNTER_FIELDS} == expected
+    assert db.get(DepartmentCounters, rated.id).incoming_unanswered == 2
+
+def test_failed_submission_leaves_nothing_committed(db, survey_setup, client_for, submission_answers, monkeypatch):
+    user, survey, rater, rated = survey_setup
+    get_counters(db, rater.id, refresh=True)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("counter update failed")
+    monkeypatch.setattr(survey_routes, 'adjust_counters', fail)
+
+    response = client_for(user.username).post(
+        f'/api/surveys/{survey.id}/submit_response', json={"answers": submission_answers(db, survey)}
+    )
+    assert response.status_code == 500
+
+    db.expire_all()
+    assert db.query(SurveySubmission).filter(SurveySubmission.survey_id == survey.id).count() == 0
+    assert db.get(DepartmentCounters, rater.id).pending_surveys == compute_counters(db, rater.id, survey.period_id)["pending_surveys"]
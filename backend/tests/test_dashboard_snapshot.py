@@ -0,0 +1,42 @@
+from backend.models import DashboardSnapshot, Survey
+from backend.routes import dashboard_route, survey_routes
+from backend.utils.response_cache import invalidate_dashboards
+from backend.utils.dashboard_snapshot import SNAPSHOT_ID, compute_admin_counters, get_snapshot
+
+def test_submission_keeps_snapshot_equal_to_recompute(db, survey_setup, client_for, submission_answers):
+    user, survey, rater, rated = survey_setup
+    # Build the snapshot first so the submission has to increment it
+    get_snapshot(db, refresh=True)
+
+    response = client_for(user.username).post(
+        f'/api/surveys/{survey.id}/submit_response', json={"answers": submission_answers(db, survey)}
+    )
+    assert response.status_code == 200
+
+    db.expire_all()
+    snapshot = db.get(DashboardSnapshot, SNAPSHOT_ID)
+    expected = compute_admin_counters(db)
+    assert snapshot.total_surveys_assigned == expected["assigned"]
+    assert snapshot.total_surveys_submitted == expected["submitted"]
+    assert snapshot.on_time_submissions == expected["on_time"]
+    assert snapshot.late_submissions == expected["late"]
+
+def test_refresh_bypasses_the_cached_admin_stats(db, survey_setup, client_for, monkeypatch):
+    user, survey, rater, rated = survey_setup
+    monkeypatch.setattr(dashboard_route, 'SessionLocal', survey_routes.SessionLocal)
+    client = client_for(user.username)
+    invalidate_dashboards()
+
+    cached = client.get('/api/dashboard/admin-stats')
+    assert cached.status_code == 200
+    assert client.get('/api/dashboard/admin-stats').headers['X-Cache'] == 'HIT'
+
+    # A survey the cached stats don't count yet
+    db.add(Survey(title="Refresh", rated_department_id=rater.id, managing_department_id=rated.id, period_id=survey.period_id))
+    db.commit()
+    for _ in range(2):
+        refreshed = client.get('/api/dashboard/admin-stats?refresh=true')
+        assert refreshed.headers['X-Cache'] == 'BYPASS'
+    assert refreshed.get_json() != cached.get_json()
+    # The recompute also replaces what non-refresh requests are served
+    assert client.get('/api/dashboard/admin-stats').get_json() == refreshed.get_json()
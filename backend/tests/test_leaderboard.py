@@ -0,0 +1,30 @@
+from backend.models import DepartmentPeriodRating, SurveySubmission
+from backend.utils import leaderboard as leaderboard_module
+from backend.utils.leaderboard import leaderboard
+
+def test_failed_leaderboard_update_keeps_the_submission(db, survey_setup, client_for, submission_answers, monkeypatch):
+    user, survey, rater, rated = survey_setup
+    leaderboard.get(db, survey.period_id)
+    # Not a mapped class, so the post-commit rollup read raises
+    monkeypatch.setattr(leaderboard_module, 'DepartmentPeriodRating', object)
+
+    response = client_for(user.username).post(
+        f'/api/surveys/{survey.id}/submit_response', json={"answers": submission_answers(db, survey)}
+    )
+    assert response.status_code == 200
+    assert db.query(SurveySubmission).filter(SurveySubmission.survey_id == survey.id).count() == 1
+    leaderboard.invalidate()
+
+def test_expired_ranking_is_reloaded_from_the_rollup(db, survey_setup, monkeypatch):
+    user, survey, rater, rated = survey_setup
+    assert leaderboard.get(db, survey.period_id).score(rated.id) is None
+
+    # Another worker's submission only reaches the rollup
+    db.add(DepartmentPeriodRating(department_id=rated.id, period_id=survey.period_id, rating_sum=80.0, rating_count=1))
+    db.flush()
+    assert leaderboard.get(db, survey.period_id).score(rated.id) is None
+
+    clock = leaderboard_module.time.monotonic() + leaderboard_module.LEADERBOARD_TTL + 1
+    monkeypatch.setattr(leaderboard_module.time, 'monotonic', lambda: clock)
+    assert leaderboard.get(db, survey.period_id).score(rated.id) == 80.0
+    leaderboard.invalidate()
@@ -0,0 +1,38 @@
+import logging
+from backend.utils import events
+from backend.utils.events import Broadcaster, SUBSCRIBER_QUEUE_SIZE, DROP_LOG_SAMPLE_EVERY
+from backend.utils.logging_config import SamplingFilter
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+def test_slow_subscriber_drops_are_sampled():
+    handler = _Collect()
+    handler.addFilter(SamplingFilter())
+    events.logger.addHandler(handler)
+    try:
+        broadcaster = Broadcaster()
+        broadcaster.subscribe()
+        for i in range(SUBSCRIBER_QUEUE_SIZE + 2 * DROP_LOG_SAMPLE_EVERY + 1):
+            broadcaster.publish(i)
+    finally:
+        events.logger.removeHandler(handler)
+
+    # Drops 1, N + 1 and 2N + 1 are logged; the later two carry the skipped count
+    assert len(handler.records) == 3
+    assert [getattr(r, 'suppressed', 0) for r in handler.records] == [0, DROP_LOG_SAMPLE_EVERY - 1, DROP_LOG_SAMPLE_EVERY - 1]
+
+def test_sampling_is_per_call_site():
+    sampling = SamplingFilter()
+
+    def record(lineno):
+        return logging.LogRecord('x', logging.INFO, 'x.py', lineno, '%s', ('a',), None)
+
+    first, second = record(1), record(2)
+    first.sample_every = second.sample_every = 10
+    assert sampling.filter(first) and sampling.filter(second)
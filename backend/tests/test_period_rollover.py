@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+from backend.models import Period, Survey, Question, Option
+from backend.scripts.period_rollover import rollover_period
+from backend.utils.attendance import department_attendance
+
+def _question_texts(db, survey_id):
+    return [q.text for q in db.query(Question).filter(Question.survey_id == survey_id).order_by(Question.order)]
+
+def test_rollover_clones_each_survey_of_a_department_pair_once(db, survey_setup):
+    user, survey, rater, rated = survey_setup
+    # create_survey allows a second survey for the same (rated, managing) pair
+    second = Survey(
+        title="Second", rated_department_id=rated.id,
+        managing_department_id=rater.id, period_id=survey.period_id
+    )
+    db.add(second)
+    db.flush()
+    db.add_all([
+        Question(survey_id=second.id, text=f"Second {i}", type='rating', order=i, category="QUALITY")
+        for i in (1, 2)
+    ])
+    db.flush()
+    first_question = db.query(Question).filter(Question.survey_id == survey.id, Question.order == 1).one()
+    db.add(Option(question_id=first_question.id, text="Good", value="4", order=1))
+    db.commit()
+
+    result = rollover_period(survey.period_id, "Rollover clone test", db=db)
+
+    sources = [survey, second]
+    clones = db.query(Survey).filter(Survey.period_id == result["period_id"]).order_by(Survey.id).all()
+    assert [c.title for c in clones] == [s.title for s in sources]
+    for source, clone in zip(sources, clones):
+        assert _question_texts(db, clone.id) == _question_texts(db, source.id)
+    assert result["questions"] == 7
+    assert result["options"] == 1
+
+def test_rollover_leaves_closed_period_attendance_alone(db, survey_setup):
+    user, survey, rater, rated = survey_setup
+    now = datetime.now()
+    period = db.get(Period, survey.period_id)
+    period.end_date = now - timedelta(days=10)
+    db.commit()
+    before = department_attendance(db, period.id, now=now)
+    assert [(d["department_id"], d["missed"], d["pending"]) for d in before] == [(rater.id, 1, 0)]
+
+    # Re-dates every permission to the new window
+    rollover_period(period.id, "Rollover attendance test", now, now + timedelta(days=30), db=db)
+
+    assert department_attendance(db, period.id, now=now) == before
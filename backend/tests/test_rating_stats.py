@@ -0,0 +1,42 @@
+import math
+import numpy as np
+from backend.models import ArchivedSurveySubmission
+from backend.utils.rating_stats import histogram_stats, grouped_stats, period_rating_stats
+
+def test_histogram_stats_match_numpy_on_expanded_ratings():
+    histograms = np.array([[1, 0, 3, 2], [0, 0, 0, 0], [0, 5, 0, 0]])
+    stats = histogram_stats(histograms)
+    ratings = np.repeat([1, 2, 3, 4], histograms[0])
+    assert stats["count"].tolist() == [6, 0, 5]
+    assert math.isclose(stats["mean"][0], ratings.mean())
+    assert math.isclose(stats["std"][0], ratings.std())
+    for q in (25, 50, 75, 90):
+        assert math.isclose(stats[f"p{q}"][0], np.percentile(ratings, q))
+        assert stats[f"p{q}"][2] == 2
+    assert math.isnan(stats["mean"][1])
+
+def test_grouped_stats_match_numpy_per_group():
+    values = np.array([70.0, 90.0, np.nan, 50.0, 100.0, 80.0])
+    groups = np.array([0, 0, 0, 2, 2, 2])
+    stats = grouped_stats(values, groups, 3)
+    assert stats["count"].tolist() == [2, 0, 3]
+    assert math.isclose(stats["p50"][0], 80.0)
+    assert math.isclose(stats["p25"][2], np.percentile([50, 80, 100], 25))
+    assert math.isclose(stats["std"][2], np.std([50, 80, 100]))
+    assert (stats["min"][2], stats["max"][2]) == (50.0, 100.0)
+    assert math.isnan(stats["p50"][1])
+
+def test_period_rating_stats_reads_archived_submissions(db, survey_setup):
+    user, survey, rater, rated = survey_setup
+    # Only the archive holds this period's submission, as after archive_periods
+    db.add(ArchivedSurveySubmission(
+        id=-1, period_id=survey.period_id, survey_id=survey.id, submitter_user_id=user.id,
+        submitter_department_id=rater.id, rated_department_id=rated.id,
+        rating_vector='4' * 20, status='Submitted'
+    ))
+    db.flush()
+
+    stats = period_rating_stats(db, period_id=survey.period_id)
+    assert stats["submissions"] == 1
+    assert [d["department_id"] for d in stats["departments"]] == [rated.id]
+    assert stats["departments"][0]["overall"]["mean"] == 100.0
@@ -0,0 +1,37 @@
+import math
+import numpy as np
+from backend.utils.rating_vectors import (
+    encode_rating_vector, decode_rating_vectors, overall_ratings, RATING_VECTOR_LENGTH
+)
+
+def test_encode_rating_vector_positions_by_order():
+    vector = encode_rating_vector({1: 4, 2: 3, 20: 1})
+    assert len(vector) == RATING_VECTOR_LENGTH
+    assert vector[0] == '4'
+    assert vector[1] == '3'
+    assert vector[19] == '1'
+    assert vector[2:19] == '0' * 17
+
+def test_encode_rating_vector_ignores_invalid_entries():
+    assert encode_rating_vector({0: 4, 21: 4, 3: 7}) == '0' * RATING_VECTOR_LENGTH
+
+def test_decode_rating_vectors_round_trip():
+    vectors = [encode_rating_vector({i: (i % 4) + 1 for i in range(1, 21)}), None]
+    matrix = decode_rating_vectors(vectors)
+    assert matrix.shape == (2, RATING_VECTOR_LENGTH)
+    assert matrix.dtype == np.uint8
+    assert list(matrix[0][:4]) == [2, 3, 4, 1]
+    assert not matrix[1].any()
+
+def test_decode_rating_vectors_empty():
+    assert decode_rating_vectors([]).shape == (0, RATING_VECTOR_LENGTH)
+
+def test_overall_ratings_matches_category_average_formula():
+    all_fours = encode_rating_vector({i: 4 for i in range(1, 21)})
+    mixed = encode_rating_vector({i: 3 if i <= 4 else 4 for i in range(1, 21)})
+    incomplete = encode_rating_vector({1: 4})
+    overall = overall_ratings(decode_rating_vectors([all_fours, mixed, incomplete]))
+    assert overall[0] == 100.0
+    # QUALITY averages 3, the other four categories 4: ((3 + 4 * 4) / 5) * 25
+    assert overall[1] == 95.0
+    assert math.isnan(overall[2])
@@ -0,0 +1,175 @@
+# backend/utils/action_plans.py
+# Overdue and due-soon action plans (action_plan_alerts).
+#
+# An action plan is the explanation / action_plan / target_date a department
+# writes against a low rating it received; it stays open until the rating
+# department acknowledges it. A periodic sweep materializes the open plans
+# whose target date has passed ('overdue') or falls within DUE_SOON_DAYS
+# ('due_soon') into action_plan_alerts, so the list and the badge counters are
+# primary-key / index reads instead of a scan of survey_responses.
+#
+# The sweep is a single INSERT ... SELECT on the
+# (to_department_id, acknowledged, target_date) index, followed by one UPDATE
+# of department_counters, in one transaction. On SQL Server the transaction
+# first takes an exclusive application lock (sp_getapplock), so sweeps started
+# by several worker processes or cron never overlap; a sweep that finds the
+# lock taken is skipped. Acknowledging a plan removes its alert immediately
+# (resolve_alerts); new or changed target dates are picked up by the next sweep.
+#
+# Nothing starts the sweep on import: run backend/scripts/sweep_action_plans.py
+# from cron, or call start_sweeper() from a process entry point.
+
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, update, delete, func, case, literal, or_, text
+from backend.database import SessionLocal
+from backend.models import ActionPlanAlert, DepartmentCounters, SurveyResponse
+from backend.utils.counters import adjust_counters
+from backend.utils.jobs import job_registry
+
+logger = logging.getLogger(__name__)
+
+STATUS_OVERDUE = 'overdue'
+STATUS_DUE_SOON = 'due_soon'
+STATUS_COUNTERS = {
+    STATUS_OVERDUE: 'overdue_action_plans',
+    STATUS_DUE_SOON: 'due_soon_action_plans',
+}
+
+DUE_SOON_DAYS = int(os.getenv('ACTION_PLAN_DUE_SOON_DAYS', 7))
+# Seconds between scheduled sweeps; 0 disables the scheduler
+SWEEP_INTERVAL = int(os.getenv('ACTION_PLAN_SWEEP_INTERVAL', 900))
+SWEEP_LOCK = 'sweep_action_plans'
+
+
+def _acquire_sweep_lock(db):
+    """
+    Takes the transaction-scoped sweep lock without waiting. Returns False if
+    another process holds it. Other databases (local SQLite) run unlocked.
+    """
+    if db.get_bind().dialect.name != 'mssql':
+        return True
+    result = db.execute(text(
+        "SET NOCOUNT ON; DECLARE @result INT; "
+        "EXEC @result = sp_getapplock @Resource = :resource, @LockMode = 'Exclusive', "
+        "@LockOwner = 'Transaction', @LockTimeout = 0; "
+        "SELECT @result"
+    ), {"resource": SWEEP_LOCK}).scalar()
+    return result is not None and result >= 0
+
+
+def _status_counts(status):
+    return (
+        select(func.count(ActionPlanAlert.response_id))
+        .where(
+            ActionPlanAlert.to_department_id == DepartmentCounters.department_id,
+            ActionPlanAlert.status == status
+        )
+        .scalar_subquery()
+    )
+
+
+def sweep_action_plans(db=None, now=None, report=None):
+    """
+    Rebuilds action_plan_alerts and the action plan counters in one
+    transaction. Returns the number of alerts per status, or
+    {"skipped": True} when another sweep is running.
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    now = now or datetime.now()
+    due_soon_until = now + timedelta(days=DUE_SOON_DAYS)
+    try:
+        if not _acquire_sweep_lock(db):
+            db.rollback()
+            logger.info("Action plan sweep skipped: another sweep is running.")
+            return {"skipped": True}
+        open_plans = (
+            select(
+                SurveyResponse.id,
+                SurveyResponse.to_department_id,
+                SurveyResponse.from_department_id,
+                SurveyResponse.target_date,
+                case((SurveyResponse.target_date < now, STATUS_OVERDUE), else_=STATUS_DUE_SOON),
+                SurveyResponse.responsible_person,
+                literal(now)
+            )
+            .where(
+                SurveyResponse.to_department_id != None,
+                or_(SurveyResponse.acknowledged == False, SurveyResponse.acknowledged == None),
+                SurveyResponse.target_date != None,
+                SurveyResponse.target_date < due_soon_until
+            )
+        )
+        columns = [
+            'response_id', 'to_department_id', 'from_department_id', 'target_date',
+            'status', 'responsible_person', 'swept_at'
+        ]
+        db.execute(delete(ActionPlanAlert))
+        db.execute(insert(ActionPlanAlert).from_select(columns, open_plans))
+        db.execute(
+            update(DepartmentCounters).values(
+                updated_at=now,
+                **{field: _status_counts(status) for status, field in STATUS_COUNTERS.items()}
+            )
+        )
+        db.commit()
+
+        counts = dict(db.execute(
+            select(ActionPlanAlert.status, func.count(ActionPlanAlert.response_id))
+            .group_by(ActionPlanAlert.status)
+        ).all())
+        result = {status: counts.get(status, 0) for status in STATUS_COUNTERS}
+        logger.info("Action plan sweep: %s overdue, %s due soon.", result['overdue'], result['due_soon'])
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
+
+
+def resolve_alerts(db, response_ids):
+    """
+    Removes the alerts of acknowledged plans and lowers the receiving
+    departments' counters, inside the caller's transaction.
+    """
+    if not response_ids:
+        return
+    rows = db.execute(
+        select(ActionPlanAlert.to_department_id, ActionPlanAlert.status)
+        .where(ActionPlanAlert.response_id.in_(response_ids))
+    ).all()
+    if not rows:
+        return
+    deltas = defaultdict(lambda: defaultdict(int))
+    for department_id, status in rows:
+        deltas[department_id][STATUS_COUNTERS[status]] -= 1
+    db.execute(delete(ActionPlanAlert).where(ActionPlanAlert.response_id.in_(response_ids)))
+    for department_id, department_deltas in deltas.items():
+        adjust_counters(db, department_id, **department_deltas)
+
+
+def start_sweeper(interval=SWEEP_INTERVAL):
+    """Starts the periodic sweep as a background job. Returns None when disabled."""
+    if interval <= 0:
+        return None
+    return job_registry.schedule('sweep_action_plans', interval, sweep_action_plans)
+
+
+def alert_to_dict(alert, now=None):
+    now = now or datetime.now()
+    return {
+        "response_id": alert.response_id,
+        "to_department_id": alert.to_department_id,
+        "from_department_id": alert.from_department_id,
+        "status": alert.status,
+        "target_date": alert.target_date.isoformat() if alert.target_date else None,
+        # Negative once the target date has passed
+        "days_remaining": (alert.target_date.date() - now.date()).days if alert.target_date else None,
+        "responsible_person": alert.responsible_person,
+        "swept_at": alert.swept_at.isoformat() if alert.swept_at else None
+    }
@@ -0,0 +1,127 @@
+# backend/utils/attendance.py
+# Set-based survey attendance.
+#
+# Every survey of a period is one expected (from department -> to department)
+# submission. Its deadline is the end_date of the survey's period, with a
+# 7 day grace period; only a period without an end_date falls back to the
+# permission end_date of the pair, which moves when the matrix is re-dated for
+# a new period. A single grouped query classifies each expected survey and
+# rolls the result up per surveying department:
+#
+#   on_time - first submission on or before the deadline
+#   late    - first submission within the grace period
+#   missed  - nothing submitted by the end of the grace period
+#   pending - not submitted yet, grace period still running
+
+from datetime import datetime
+from sqlalchemy import select, func, case, and_, literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import DateTime
+from backend.models import Survey, SurveySubmission, Permission, Department, Period
+
+GRACE_PERIOD_DAYS = 7
+
+STATUS_ON_TIME = 'on_time'
+STATUS_LATE = 'late'
+STATUS_MISSED = 'missed'
+STATUS_PENDING = 'pending'
+
+
+class add_days(FunctionElement):
+    """Portable `datetime column + N days`."""
+    type = DateTime()
+    inherit_cache = True
+    name = 'add_days'
+
+@compiles(add_days)
+def _add_days_default(element, compiler, **kw):
+    column, days = list(element.clauses)
+    return f"DATEADD(day, {compiler.process(days, **kw)}, {compiler.process(column, **kw)})"
+
+@compiles(add_days, 'sqlite')
+def _add_days_sqlite(element, compiler, **kw):
+    column, days = list(element.clauses)
+    return f"datetime({compiler.process(column, **kw)}, '+' || {compiler.process(days, **kw)} || ' days')"
+
+
+def attendance_status_query(period_id, now=None):
+    """One row per expected survey of the period with its attendance status."""
+    now = now or datetime.utcnow()
+
+    first_submission = (
+        select(
+            SurveySubmission.survey_id,
+            SurveySubmission.submitter_department_id,
+            func.min(SurveySubmission.submitted_at).label('submitted_at')
+        )
+        .where(SurveySubmission.status != 'Draft')
+        .group_by(SurveySubmission.survey_id, SurveySubmission.submitter_department_id)
+        .subquery('first_submission')
+    )
+
+    deadline = func.coalesce(Period.end_date, Permission.end_date)
+    grace_end = add_days(deadline, literal(GRACE_PERIOD_DAYS))
+    submitted_at = first_submission.c.submitted_at
+    status = case(
+        (and_(submitted_at != None, deadline == None), STATUS_ON_TIME),
+        (submitted_at <= deadline, STATUS_ON_TIME),
+        (submitted_at <= grace_end, STATUS_LATE),
+        (grace_end < now, STATUS_MISSED),
+        else_=STATUS_PENDING
+    )
+
+    return (
+        select(
+            Survey.managing_department_id.label('from_dept_id'),
+            Survey.rated_department_id.label('to_dept_id'),
+            Survey.period_id,
+            status.label('status')
+        )
+        .join(Period, Period.id == Survey.period_id)
+        .join(Permission, and_(
+            Permission.from_dept_id == Survey.managing_department_id,
+            Permission.to_dept_id == Survey.rated_department_id
+        ))
+        .outerjoin(first_submission, and_(
+            first_submission.c.survey_id == Survey.id,
+            first_submission.c.submitter_department_id == Survey.managing_department_id
+        ))
+        .where(Survey.period_id == period_id)
+    )
+
+
+def department_attendance(db, period_id, now=None):
+    """Per surveying department rollup of attendance_status_query(), in one statement."""
+    statuses = attendance_status_query(period_id, now).subquery('statuses')
+
+    def count_status(value):
+        return func.coalesce(func.sum(case((statuses.c.status == value, 1), else_=0)), 0)
+
+    rows = db.execute(
+        select(
+            Department.id,
+            Department.name,
+            func.count().label('expected'),
+            count_status(STATUS_ON_TIME).label(STATUS_ON_TIME),
+            count_status(STATUS_LATE).label(STATUS_LATE),
+            count_status(STATUS_MISSED).label(STATUS_MISSED),
+            count_status(STATUS_PENDING).label(STATUS_PENDING)
+        )
+        .join(statuses, statuses.c.from_dept_id == Department.id)
+        .group_by(Department.id, Department.name)
+        .order_by(Department.name)
+    ).all()
+
+    return [
+        {
+            "department_id": row.id,
+            "name": row.name,
+            "expected": row.expected,
+            STATUS_ON_TIME: row.on_time,
+            STATUS_LATE: row.late,
+            STATUS_MISSED: row.missed,
+            STATUS_PENDING: row.pending,
+        }
+        for row in rows
+    ]
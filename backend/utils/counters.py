@@ -0,0 +1,163 @@
+# backend/utils/counters.py
+# Per-department navigation badge counters (department_counters).
+#
+#   pending_surveys         - current-period surveys the department manages
+#                             and has not submitted yet
+#   incoming_unanswered     - low ratings (1 or 2) received without an explanation
+#   outgoing_unacknowledged - answered low ratings the department gave and
+#                             has not acknowledged yet
+#   overdue_action_plans    - open action plans past their target date and
+#   due_soon_action_plans     due within a few days, as of the last sweep
+#                             (backend/utils/action_plans.py)
+#
+# Write paths adjust the numbers with relative UPDATEs inside their own
+# transaction (adjust_counters), so concurrent writers never lose updates.
+# A missing row is computed from the source tables on first read; operations
+# that reshape the survey set or open a new period drop all rows
+# (reset_counters).
+
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import select, update, delete, func, exists, or_, and_
+from sqlalchemy.exc import IntegrityError
+from backend.models import DepartmentCounters, Survey, SurveySubmission, SurveyResponse, ActionPlanAlert
+from backend.utils.periods import get_current_period
+
+COUNTER_FIELDS = (
+    'pending_surveys', 'incoming_unanswered', 'outgoing_unacknowledged',
+    'overdue_action_plans', 'due_soon_action_plans'
+)
+LOW_RATINGS = (1, 2)
+
+
+def _unanswered():
+    return or_(SurveyResponse.explanation == None, SurveyResponse.explanation == '')
+
+
+def compute_counters(db, department_id, period_id):
+    """All badge numbers for one department in a single statement."""
+    submitted = exists().where(and_(
+        SurveySubmission.survey_id == Survey.id,
+        SurveySubmission.submitter_department_id == department_id,
+        SurveySubmission.status != 'Draft'
+    ))
+    pending = (
+        select(func.count(Survey.id))
+        .where(Survey.managing_department_id == department_id, Survey.period_id == period_id, ~submitted)
+        .scalar_subquery()
+    )
+    incoming = (
+        select(func.count(SurveyResponse.id))
+        .where(
+            SurveyResponse.to_department_id == department_id,
+            SurveyResponse.rating.in_(LOW_RATINGS),
+            _unanswered()
+        )
+        .scalar_subquery()
+    )
+    outgoing = (
+        select(func.count(SurveyResponse.id))
+        .where(
+            SurveyResponse.from_department_id == department_id,
+            SurveyResponse.rating.in_(LOW_RATINGS),
+            ~_unanswered(),
+            or_(SurveyResponse.acknowledged == False, SurveyResponse.acknowledged == None)
+        )
+        .scalar_subquery()
+    )
+    action_plans = [
+        select(func.count(ActionPlanAlert.response_id))
+        .where(ActionPlanAlert.to_department_id == department_id, ActionPlanAlert.status == status)
+        .scalar_subquery()
+        for status in ('overdue', 'due_soon')
+    ]
+    row = db.execute(select(pending, incoming, outgoing, *action_plans)).one()
+    return dict(zip(COUNTER_FIELDS, row))
+
+
+def get_counters(db, department_id, refresh=False):
+    """Primary-key read of the department's counters, computed when missing. Commits on recompute."""
+    counters = db.get(DepartmentCounters, department_id)
+    if counters and not refresh:
+        return counters
+
+    period = get_current_period(db)
+    period_id = period.id if period else None
+    values = compute_counters(db, department_id, period_id)
+    if not counters:
+        counters = DepartmentCounters(department_id=department_id)
+        db.add(counters)
+    counters.period_id = period_id
+    for field, value in values.items():
+        setattr(counters, field, value)
+    counters.updated_at = datetime.now()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request created the row first; use theirs
+        db.rollback()
+        counters = db.get(DepartmentCounters, department_id)
+    return counters
+
+
+def adjust_counters(db, department_id, period_id=None, **deltas):
+    """
+    Applies relative changes, e.g. adjust_counters(db, 3, incoming_unanswered=2),
+    inside the caller's transaction. With period_id, the row is only touched if
+    it was computed for that period. Departments without a row are skipped;
+    their counters are computed fresh on the next read.
+    """
+    values = {
+        field: getattr(DepartmentCounters, field) + delta
+        for field, delta in deltas.items() if delta
+    }
+    if department_id is None or not values:
+        return
+    stmt = update(DepartmentCounters).where(DepartmentCounters.department_id == department_id)
+    if period_id is not None:
+        stmt = stmt.where(DepartmentCounters.period_id == period_id)
+    db.execute(stmt.values(updated_at=datetime.now(), **values))
+
+
+def feedback_flags(response):
+    """Which badges a survey_responses row currently counts towards, as 0/1."""
+    low = response.rating in LOW_RATINGS
+    answered = bool(response.explanation)
+    return {
+        "incoming_unanswered": int(low and not answered),
+        "outgoing_unacknowledged": int(low and answered and not response.acknowledged),
+    }
+
+
+def apply_feedback_change(db, response, before):
+    """Adjusts both departments' counters after a feedback row changed from `before` (feedback_flags)."""
+    apply_feedback_changes(db, [(response, before)])
+
+
+def apply_feedback_changes(db, changes):
+    """
+    Batch form of apply_feedback_change for [(response, before)] pairs: deltas
+    are summed per department and applied with one UPDATE per department.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for response, before in changes:
+        after = feedback_flags(response)
+        deltas[response.to_department_id]["incoming_unanswered"] += after["incoming_unanswered"] - before["incoming_unanswered"]
+        deltas[response.from_department_id]["outgoing_unacknowledged"] += after["outgoing_unacknowledged"] - before["outgoing_unacknowledged"]
+    for department_id, department_deltas in deltas.items():
+        adjust_counters(db, department_id, **department_deltas)
+
+
+def reset_counters(db):
+    """Drops every department's counters so they are recomputed on next read. Commits."""
+    db.execute(delete(DepartmentCounters))
+    db.commit()
+
+
+def counters_to_dict(counters):
+    return {
+        "department_id": counters.department_id,
+        "period_id": counters.period_id,
+        **{field: getattr(counters, field) for field in COUNTER_FIELDS},
+        "updated_at": counters.updated_at.isoformat() if counters.updated_at else None
+    }
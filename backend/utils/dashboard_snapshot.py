@@ -0,0 +1,122 @@
+# backend/utils/dashboard_snapshot.py
+# Materialized admin dashboard counters.
+#
+# /api/dashboard/admin-stats reads a single dashboard_snapshot row by primary
+# key. The submission path bumps the counters in place (record_submission);
+# operations that change the set of surveys drop the row (invalidate_snapshot)
+# and the next read recomputes it with one conditional-aggregation query.
+
+import json
+from datetime import datetime
+from sqlalchemy import select, update, delete, func, case
+from backend.models import DashboardSnapshot, Survey, SurveySubmission, SurveyResponse, Department
+from backend.utils.response_cache import invalidate_dashboards
+
+SNAPSHOT_ID = 1
+BELOW_TARGET_SCORE = 80
+
+def compute_admin_counters(db):
+    """All submission counters in one conditional-aggregation query."""
+    total_assigned = select(func.count(Survey.id)).scalar_subquery()
+    row = db.execute(
+        select(
+            total_assigned.label('assigned'),
+            func.count(SurveySubmission.id).label('submitted'),
+            func.coalesce(func.sum(case((SurveySubmission.survey_attendance == 100.0, 1), else_=0)), 0).label('on_time'),
+            func.coalesce(func.sum(case((SurveySubmission.survey_attendance == 95.0, 1), else_=0)), 0).label('late'),
+        ).where(SurveySubmission.status != 'Draft')
+    ).one()
+    return {
+        "assigned": row.assigned or 0,
+        "submitted": row.submitted or 0,
+        "on_time": row.on_time or 0,
+        "late": row.late or 0,
+    }
+
+def compute_department_performance(db):
+    # super_overall is itself AVG(overall_rating) per department, so average the source column directly
+    rows = db.execute(
+        select(Department.name, func.avg(SurveyResponse.overall_rating))
+        .join(SurveyResponse, SurveyResponse.to_department_id == Department.id)
+        .where(SurveyResponse.overall_rating != None)
+        .group_by(Department.name)
+    ).all()
+    return {name: avg for name, avg in rows}
+
+def refresh_snapshot(db):
+    """Full recompute of the snapshot row. Commits."""
+    counters = compute_admin_counters(db)
+    performance = compute_department_performance(db)
+    snapshot = db.get(DashboardSnapshot, SNAPSHOT_ID)
+    if not snapshot:
+        snapshot = DashboardSnapshot(id=SNAPSHOT_ID)
+        db.add(snapshot)
+    snapshot.total_surveys_assigned = counters["assigned"]
+    snapshot.total_surveys_submitted = counters["submitted"]
+    snapshot.on_time_submissions = counters["on_time"]
+    snapshot.late_submissions = counters["late"]
+    snapshot.department_performance = json.dumps(performance)
+    snapshot.updated_at = datetime.now()
+    db.commit()
+    return snapshot
+
+def get_snapshot(db, refresh=False):
+    snapshot = None if refresh else db.get(DashboardSnapshot, SNAPSHOT_ID)
+    return snapshot or refresh_snapshot(db)
+
+def record_submission(db, attendance, department_name=None, department_average=None):
+    """
+    Incrementally applies one new submission to the snapshot inside the
+    caller's transaction, which must also hold the submission itself so a
+    concurrent refresh_snapshot() never counts it twice. No-op when the
+    snapshot has not been built yet.
+    """
+    db.execute(
+        update(DashboardSnapshot)
+        .where(DashboardSnapshot.id == SNAPSHOT_ID)
+        .values(
+            total_surveys_submitted=DashboardSnapshot.total_surveys_submitted + 1,
+            on_time_submissions=DashboardSnapshot.on_time_submissions + (1 if attendance == 100.0 else 0),
+            late_submissions=DashboardSnapshot.late_submissions + (1 if attendance == 95.0 else 0),
+            updated_at=datetime.now()
+        )
+    )
+    if department_name is not None and department_average is not None:
+        snapshot = db.execute(
+            select(DashboardSnapshot).where(DashboardSnapshot.id == SNAPSHOT_ID).with_for_update()
+        ).scalar_one_or_none()
+        if snapshot:
+            performance = json.loads(snapshot.department_performance or '{}')
+            performance[department_name] = department_average
+            snapshot.department_performance = json.dumps(performance)
+
+def invalidate_snapshot(db):
+    """Drops the snapshot (and cached dashboard responses) so the next read recomputes it. Commits."""
+    db.execute(delete(DashboardSnapshot).where(DashboardSnapshot.id == SNAPSHOT_ID))
+    db.commit()
+    invalidate_dashboards()
+
+def snapshot_to_stats(snapshot):
+    """Shapes the snapshot like the original admin-stats response."""
+    performance = json.loads(snapshot.department_performance or '{}')
+    department_performance = [
+        {"name": name, "super_overall": round(avg or 0, 2)}
+        for name, avg in sorted(performance.items())
+    ]
+    assigned = snapshot.total_surveys_assigned
+    submitted = snapshot.total_surveys_submitted
+    return {
+        "total_surveys_assigned": assigned,
+        "total_surveys_submitted": submitted,
+        "surveys_not_submitted": assigned - submitted,
+        "department_performance": department_performance,
+        "below_80_departments": [
+            d["name"] for d in department_performance if d["super_overall"] < BELOW_TARGET_SCORE
+        ],
+        "survey_attendance_stats": {
+            "on_time": snapshot.on_time_submissions,
+            "late": snapshot.late_submissions,
+            "missed": assigned - submitted
+        },
+        "updated_at": snapshot.updated_at.isoformat() if snapshot.updated_at else None
+    }
@@ -0,0 +1,116 @@
+# backend/utils/events.py
+# Publish/subscribe for live dashboard updates (Server-Sent Events).
+#
+# Write paths call publish_event() with a small delta; every open
+# /api/dashboard/stream connection receives it. With a single worker the
+# in-process Broadcaster is enough. When several worker processes serve the
+# app, set EVENT_BROKER_URL (e.g. redis://localhost:6379/0) and events are
+# relayed through Redis pub/sub so every worker's subscribers see them.
+
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Per-subscriber backlog; slow clients drop events instead of blocking writers
+SUBSCRIBER_QUEUE_SIZE = 100
+# A stalled client drops every event, so only every Nth drop is logged
+DROP_LOG_SAMPLE_EVERY = 100
+EVENT_CHANNEL = 'dashboard-events'
+
+
+class Broadcaster:
+    """Fans events out to the subscribers of this process."""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def publish(self, message):
+        self._fanout(message)
+
+    def _fanout(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                logger.warning(
+                    "Dropping dashboard event for a slow SSE subscriber",
+                    extra={"sample_every": DROP_LOG_SAMPLE_EVERY}
+                )
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+class RedisBroadcaster(Broadcaster):
+    """Relays events through Redis pub/sub so all worker processes receive them."""
+
+    def __init__(self, url, channel=EVENT_CHANNEL):
+        import redis  # Optional dependency, only needed for multi-worker deployments
+        super().__init__()
+        self._redis = redis.Redis.from_url(url)
+        self._channel = channel
+        listener = threading.Thread(target=self._listen, name='event-relay', daemon=True)
+        listener.start()
+
+    def publish(self, message):
+        self._redis.publish(self._channel, json.dumps(message))
+
+    def _listen(self):
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self._channel)
+        for item in pubsub.listen():
+            try:
+                self._fanout(json.loads(item['data']))
+            except (ValueError, TypeError):
+                logger.warning("Ignoring malformed dashboard event from Redis")
+
+
+def _create_broadcaster():
+    url = os.getenv('EVENT_BROKER_URL')
+    if url:
+        try:
+            return RedisBroadcaster(url)
+        except Exception as e:
+            logger.error("Could not connect event broker at %s, falling back to in-process events: %s", url, e)
+    return Broadcaster()
+
+
+broadcaster = _create_broadcaster()
+
+
+def publish_event(event_type, **data):
+    """Publishes a compact delta to every dashboard stream. Never raises."""
+    message = {
+        "type": event_type,
+        "at": datetime.now(timezone.utc).isoformat(),
+        **data
+    }
+    try:
+        broadcaster.publish(message)
+    except Exception as e:
+        logger.error("Failed to publish dashboard event '%s': %s", event_type, e)
+
+
+def format_sse(message):
+    """Serializes one event in text/event-stream format."""
+    return f"event: {message['type']}\ndata: {json.dumps(message, default=str)}\n\n"
@@ -0,0 +1,36 @@
+# backend/utils/history.py
+# Read-side helpers that make archived periods transparent to reporting code.
+# Each helper returns an ORM alias over "hot table UNION ALL archive table",
+# so it can be queried exactly like the model itself:
+#
+#     Responses = survey_responses_with_history()
+#     db.query(Responses).filter(Responses.to_department_id == dept_id)
+#
+# Use these only for historical reports; day-to-day queries should keep
+# hitting the (small) hot tables directly.
+
+from sqlalchemy import select, union_all
+from sqlalchemy.orm import aliased
+from backend.models import (
+    SurveySubmission, Answer, SurveyResponse,
+    ArchivedSurveySubmission, ArchivedAnswer, ArchivedSurveyResponse
+)
+
+def _with_history(hot_model, archive_model, name):
+    hot = hot_model.__table__
+    archive = archive_model.__table__
+    names = [c.name for c in hot.columns]
+    combined = union_all(
+        select(*[hot.c[n] for n in names]),
+        select(*[archive.c[n] for n in names])
+    ).subquery(name)
+    return aliased(hot_model, combined)
+
+def survey_responses_with_history():
+    return _with_history(SurveyResponse, ArchivedSurveyResponse, 'survey_responses_all')
+
+def survey_submissions_with_history():
+    return _with_history(SurveySubmission, ArchivedSurveySubmission, 'survey_submissions_all')
+
+def answers_with_history():
+    return _with_history(Answer, ArchivedAnswer, 'survey_answers_all')
@@ -0,0 +1,139 @@
+# backend/utils/jobs.py
+# Lightweight in-process background job runner used by long-running admin
+# operations (survey reconciliation, provisioning, ...). Jobs run on a small
+# thread pool and report their progress so the frontend can poll for status
+# instead of holding an HTTP request open.
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+# Finished jobs are kept around so clients can still read the result
+MAX_FINISHED_JOBS = 100
+
+
+class Job:
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = JOB_PENDING
+        self.progress = 0
+        self.message = None
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def report(self, progress, message=None):
+        """Progress callback handed to the job function (progress is 0-100)."""
+        with self._lock:
+            self.progress = max(0, min(100, int(progress)))
+            if message is not None:
+                self.message = message
+
+    def finish(self, status, result=None, error=None):
+        # finished_at is set before the terminal status becomes visible, so a
+        # finished job always has one (_prune sorts on it)
+        with self._lock:
+            self.result = result
+            self.error = error
+            self.finished_at = datetime.now(timezone.utc)
+            self.status = status
+
+    @property
+    def is_finished(self):
+        return self.status in (JOB_COMPLETED, JOB_FAILED)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "id": self.id,
+                "name": self.name,
+                "status": self.status,
+                "progress": self.progress,
+                "message": self.message,
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            }
+
+
+class JobRegistry:
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name, fn, *args, **kwargs):
+        """
+        Runs fn(*args, report=job.report, **kwargs) in the background.
+        If a job with the same name is still pending or running, that job is
+        returned instead of starting a second copy, so the name must include
+        any argument that makes a run different (e.g. the period id).
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.name == name and not job.is_finished:
+                    return job
+            job = Job(name)
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def schedule(self, name, interval, fn, *args, **kwargs):
+        """
+        Submits the job `name` now and then every `interval` seconds from a
+        daemon timer thread. A run that is still going is not started twice.
+        """
+        def loop(stop):
+            while not stop.is_set():
+                try:
+                    self.submit(name, fn, *args, **kwargs)
+                except Exception as e:
+                    logger.error("Could not submit scheduled job '%s': %s", name, e)
+                stop.wait(interval)
+
+        stop = threading.Event()
+        threading.Thread(target=loop, args=(stop,), name=f'schedule-{name}', daemon=True).start()
+        return stop
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = JOB_RUNNING
+        job.started_at = datetime.now(timezone.utc)
+        try:
+            result = fn(*args, report=job.report, **kwargs)
+            job.report(100)
+            job.finish(JOB_COMPLETED, result=result)
+        except Exception as e:
+            logger.error("Background job '%s' (%s) failed: %s", job.name, job.id, e, exc_info=True)
+            job.finish(JOB_FAILED, error=str(e))
+
+    def _prune(self):
+        finished = sorted(
+            (j for j in self._jobs.values() if j.is_finished),
+            key=lambda j: j.finished_at
+        )
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.id]
+
+
+# Shared registry for the whole app
+job_registry = JobRegistry()
@@ -0,0 +1,140 @@
+# backend/utils/leaderboard.py
+# In-memory department rankings, one per period.
+#
+# A ranking is a list of (-score, department id) kept sorted with bisect, so
+# a rank lookup is an O(log n) search instead of a full sort. A score change
+# finds its entries by bisect, but removing and inserting them shifts the
+# list, which is O(n); with one entry per department (a few hundred at most)
+# that is a short memmove and cheaper than a sorted container. Rankings are
+# seeded from the department_period_ratings rollup (never from
+# survey_responses), kept up to date by the submission path through
+# update_department(), and dropped when the rollup is rebuilt.
+#
+# Other worker processes' submissions only reach this process's rankings by a
+# reload, so each ranking is re-read from the rollup once it is older than
+# LEADERBOARD_TTL seconds.
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from backend.models import DepartmentPeriodRating
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_TTL = int(os.getenv('LEADERBOARD_TTL', 60))
+
+
+class PeriodRanking:
+    def __init__(self, scores=None):
+        self._scores = {}
+        self._keys = []
+        self._lock = threading.Lock()
+        for department_id, score in (scores or {}).items():
+            self._scores[department_id] = score
+            self._keys.append((-score, department_id))
+        self._keys.sort()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def update(self, department_id, score):
+        with self._lock:
+            old = self._scores.get(department_id)
+            if old is not None:
+                del self._keys[bisect_left(self._keys, (-old, department_id))]
+            insort(self._keys, (-score, department_id))
+            self._scores[department_id] = score
+
+    def score(self, department_id):
+        return self._scores.get(department_id)
+
+    def rank(self, department_id):
+        """1-based rank, or None if the department has no score in this period."""
+        with self._lock:
+            score = self._scores.get(department_id)
+            if score is None:
+                return None
+            return bisect_left(self._keys, (-score, department_id)) + 1
+
+    def percentile(self, rank):
+        # Share of ranked departments scoring below this one
+        total = len(self._keys)
+        return round(100.0 * (total - rank) / (total - 1), 2) if total > 1 else 100.0
+
+    def page(self, offset, limit):
+        """[(rank, department id, score)] for one page, best first."""
+        with self._lock:
+            keys = self._keys[offset:offset + limit]
+        return [
+            (offset + i + 1, department_id, -negative_score)
+            for i, (negative_score, department_id) in enumerate(keys)
+        ]
+
+    def below(self, threshold):
+        """Department ids scoring under `threshold`, best first."""
+        with self._lock:
+            start = bisect_right(self._keys, (-threshold, float('inf')))
+            return [department_id for _, department_id in self._keys[start:]]
+
+
+class Leaderboard:
+    def __init__(self):
+        self._rankings = {}
+        self._lock = threading.Lock()
+
+    def _load(self, db, period_id):
+        rows = db.query(
+            DepartmentPeriodRating.department_id,
+            DepartmentPeriodRating.rating_sum,
+            DepartmentPeriodRating.rating_count
+        ).filter(
+            DepartmentPeriodRating.period_id == period_id,
+            DepartmentPeriodRating.rating_count > 0
+        ).all()
+        return PeriodRanking({department_id: total / count for department_id, total, count in rows})
+
+    def _current(self, period_id):
+        # The period's ranking, unless it is missing or older than the TTL
+        with self._lock:
+            entry = self._rankings.get(period_id)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def get(self, db, period_id):
+        ranking = self._current(period_id)
+        if ranking is None:
+            ranking = self._load(db, period_id)
+            with self._lock:
+                self._rankings[period_id] = (ranking, time.monotonic() + LEADERBOARD_TTL)
+        return ranking
+
+    def update_department(self, db, period_id, department_id):
+        """
+        Re-reads one department's rollup row and moves it in the period's
+        ranking, if loaded. Never raises: it runs after the submission commits.
+        """
+        ranking = self._current(period_id)
+        if ranking is None:
+            return
+        try:
+            rollup = db.get(DepartmentPeriodRating, (department_id, period_id))
+        except Exception as e:
+            logger.error("Failed to update leaderboard for department %s: %s", department_id, e)
+            # The next get() reloads it
+            self.invalidate(period_id)
+            return
+        if rollup and rollup.rating_count:
+            ranking.update(department_id, rollup.rating_sum / rollup.rating_count)
+
+    def invalidate(self, period_id=None):
+        with self._lock:
+            if period_id is None:
+                self._rankings.clear()
+            else:
+                self._rankings.pop(period_id, None)
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,117 @@
+# backend/utils/logging_config.py
+# Central logging setup for the backend.
+#
+# configure_logging() is called once from app.py. Records go through a
+# QueueHandler: the request thread merges the arguments into the message
+# (so later changes to mutable arguments can't alter it) and puts the record
+# on a queue; a QueueListener thread formats it as a JSON line and writes it
+# to stderr.
+#
+#   LOG_LEVEL   - root level (default INFO); DEBUG output costs nothing otherwise
+#   LOG_FORMAT  - 'json' (default) or 'text' for local development
+#
+# Log with %-style arguments, never f-strings, so messages are only formatted
+# when a handler actually emits them:
+#
+#     logger.info("Exported %s rows for %s", count, department)
+#
+# High-volume messages can be sampled per call site with
+# extra={"sample_every": N}: only every Nth record logged from that source
+# line is emitted, with the number of suppressed occurrences attached.
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, extras, exception."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key != 'sample_every':
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Lets through every Nth record of a call site that passes extra={"sample_every": N}."""
+
+    def __init__(self):
+        super().__init__()
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        every = getattr(record, 'sample_every', None)
+        if not every or every <= 1:
+            return True
+        # The call site, not the format string: many sites log a bare "%s"
+        key = (record.name, record.pathname, record.lineno)
+        with self._lock:
+            seen = self._seen.get(key, 0) + 1
+            self._seen[key] = seen
+        if seen % every != 1:
+            return False
+        if seen > 1:
+            record.suppressed = every - 1
+        return True
+
+
+class _EnqueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Merge the arguments now, in the calling thread; the base class would also
+        # run the formatter here, which the listener's formatter does instead
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(level=None, fmt=None):
+    """Installs the queue-backed handler on the root logger. Safe to call more than once."""
+    global _listener
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.getenv('LOG_FORMAT', 'json')).lower()
+
+    with _lock:
+        root = logging.getLogger()
+        root.setLevel(level)
+        if _listener is not None:
+            return
+
+        output = logging.StreamHandler()
+        if fmt == 'json':
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+        records = queue.SimpleQueue()
+        handler = _EnqueueHandler(records)
+        handler.addFilter(SamplingFilter())
+        for existing in root.handlers[:]:
+            root.removeHandler(existing)
+        root.addHandler(handler)
+
+        _listener = QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
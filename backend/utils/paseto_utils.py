@@ -42,6 +42,12 @@ def paseto_required(optional=False):
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
+            # Sub-requests of /api/batch reuse the principal the batch request already verified
+            batch_principal = g.get('batch_principal')
+            if batch_principal is not None:
+                g.current_user_identity = batch_principal
+                return fn(*args, **kwargs)
+
             paseto_token = request.cookies.get(PASETO_COOKIE_NAME)
 
             if not paseto_token:
@@ -62,7 +68,7 @@ def paseto_required(optional=False):
                 g.current_user_identity = payload['identity']
                 return fn(*args, **kwargs)
             except Exception as e:
-                logger.error(f"PASETO validation failed: {e}")
+                logger.error("PASETO validation failed: %s", e)
                 return jsonify({"msg": "Invalid or tampered token"}), 401
         return decorator
     return wrapper
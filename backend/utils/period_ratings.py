@@ -0,0 +1,147 @@
+# backend/utils/period_ratings.py
+# Per-department, per-period rating rollup (department_period_ratings).
+#
+# Each row keeps sum / count / min / max of the submissions' overall ratings
+# and the sum of each category score, so averages for any period are one
+# division away. The submission path folds each new submission in with
+# record_period_rating(); rebuild_period_ratings() recomputes everything (or
+# one period) with a single INSERT ... SELECT ... GROUP BY over the hot and
+# archived tables, so closed periods keep their history.
+
+from datetime import datetime
+from sqlalchemy import select, insert, update, delete, func, case, literal
+from sqlalchemy.exc import IntegrityError
+from backend.models import DepartmentPeriodRating, Period, Survey
+from backend.utils.history import survey_responses_with_history, survey_submissions_with_history
+from backend.utils.rating_vectors import CATEGORY_SLICES, category_score_expressions, decode_rating_vectors
+from backend.utils.leaderboard import leaderboard
+
+# Rollup column holding the score sum of each category
+CATEGORY_COLUMNS = {category: f"{category.lower()}_sum" for category in CATEGORY_SLICES}
+
+
+def _category_scores(rating_vector):
+    """Per-category average (1-4) of one packed vector, matching category_score_expressions()."""
+    row = decode_rating_vectors([rating_vector])[0].astype(float)
+    return {category: float(row[columns].mean()) for category, columns in CATEGORY_SLICES.items()}
+
+
+def record_period_rating(db, department_id, period_id, overall_rating, rating_vector=None):
+    """Folds one submission into the rollup inside the caller's transaction."""
+    if department_id is None or period_id is None or overall_rating is None:
+        return
+    R = DepartmentPeriodRating
+    scores = _category_scores(rating_vector) if rating_vector else {}
+
+    values = {
+        "rating_sum": R.rating_sum + overall_rating,
+        "rating_count": R.rating_count + 1,
+        "rating_min": case((R.rating_min == None, overall_rating), (R.rating_min > overall_rating, overall_rating), else_=R.rating_min),
+        "rating_max": case((R.rating_max == None, overall_rating), (R.rating_max < overall_rating, overall_rating), else_=R.rating_max),
+        "updated_at": datetime.now(),
+    }
+    if scores:
+        values["category_count"] = R.category_count + 1
+        for category, score in scores.items():
+            column = getattr(R, CATEGORY_COLUMNS[category])
+            values[CATEGORY_COLUMNS[category]] = column + score
+    stmt = update(R).where(R.department_id == department_id, R.period_id == period_id).values(**values)
+
+    if db.execute(stmt).rowcount:
+        return
+    try:
+        # First submission for this department in this period
+        with db.begin_nested():
+            db.add(DepartmentPeriodRating(
+                department_id=department_id,
+                period_id=period_id,
+                rating_sum=overall_rating,
+                rating_count=1,
+                rating_min=overall_rating,
+                rating_max=overall_rating,
+                category_count=1 if scores else 0,
+                updated_at=datetime.now(),
+                **{CATEGORY_COLUMNS[category]: scores.get(category, 0.0) for category in CATEGORY_COLUMNS}
+            ))
+    except IntegrityError:
+        # Another submission created the row concurrently
+        db.execute(stmt)
+
+
+def rebuild_period_ratings(db, period_id=None):
+    """
+    Recomputes the rollup for one period (all periods if None) with a single
+    grouped INSERT ... SELECT. Commits. Returns the number of rows written.
+    """
+    Responses = survey_responses_with_history()
+    Submissions = survey_submissions_with_history()
+    category_scores = category_score_expressions(Submissions.rating_vector)
+
+    aggregates = (
+        select(
+            Responses.to_department_id,
+            Survey.period_id,
+            func.sum(Responses.overall_rating),
+            func.count(Responses.id),
+            func.min(Responses.overall_rating),
+            func.max(Responses.overall_rating),
+            func.count(Submissions.rating_vector),
+            *[func.coalesce(func.sum(category_scores[category]), 0) for category in CATEGORY_COLUMNS],
+            literal(datetime.now())
+        )
+        .join(Survey, Survey.id == Responses.survey_id)
+        .outerjoin(Submissions, Submissions.id == Responses.survey_submission_id)
+        .where(
+            Responses.overall_rating != None,
+            Responses.to_department_id != None,
+            Survey.period_id != None
+        )
+        .group_by(Responses.to_department_id, Survey.period_id)
+    )
+    clear = delete(DepartmentPeriodRating)
+    if period_id is not None:
+        aggregates = aggregates.where(Survey.period_id == period_id)
+        clear = clear.where(DepartmentPeriodRating.period_id == period_id)
+
+    columns = [
+        'department_id', 'period_id', 'rating_sum', 'rating_count', 'rating_min', 'rating_max',
+        'category_count', *CATEGORY_COLUMNS.values(), 'updated_at'
+    ]
+    try:
+        db.execute(clear)
+        written = db.execute(insert(DepartmentPeriodRating).from_select(columns, aggregates)).rowcount
+        db.commit()
+        leaderboard.invalidate(period_id)
+        return written
+    except Exception:
+        db.rollback()
+        raise
+
+
+def department_trend(db, department_id):
+    """The department's rollup rows for every period, oldest first."""
+    R = DepartmentPeriodRating
+    rows = db.execute(
+        select(R, Period.name, Period.start_date, Period.end_date)
+        .join(Period, Period.id == R.period_id)
+        .where(R.department_id == department_id)
+        .order_by(Period.start_date, Period.id)
+    ).all()
+
+    trend = []
+    for rollup, name, start_date, end_date in rows:
+        trend.append({
+            "period_id": rollup.period_id,
+            "period": name,
+            "start_date": start_date.isoformat() if start_date else None,
+            "end_date": end_date.isoformat() if end_date else None,
+            "average": round(rollup.rating_sum / rollup.rating_count, 2) if rollup.rating_count else None,
+            "count": rollup.rating_count,
+            "min": rollup.rating_min,
+            "max": rollup.rating_max,
+            "categories": {
+                category: round(getattr(rollup, column) / rollup.category_count, 2) if rollup.category_count else None
+                for category, column in CATEGORY_COLUMNS.items()
+            }
+        })
+    return trend
@@ -0,0 +1,40 @@
+# backend/utils/periods.py
+# Helpers for resolving survey periods (half-year cycles).
+
+from datetime import datetime
+from sqlalchemy import or_, and_
+from backend.models import Period
+
+def get_current_period(db, at=None):
+    """
+    Returns the period covering `at` (defaults to now). If no period covers it,
+    falls back to the most recently started period, or None if there are none.
+    """
+    at = at or datetime.now()
+    period = db.query(Period).filter(
+        or_(Period.start_date == None, Period.start_date <= at),
+        or_(Period.end_date == None, Period.end_date >= at)
+    ).order_by(Period.start_date.desc(), Period.id.desc()).first()
+    if period:
+        return period
+    return db.query(Period).order_by(Period.start_date.desc(), Period.id.desc()).first()
+
+def get_previous_period(db, period):
+    """The period that started before `period` (by start date, then id), or None."""
+    if period is None:
+        return None
+    if period.start_date is None:
+        earlier = Period.id < period.id
+    else:
+        earlier = or_(
+            Period.start_date < period.start_date,
+            and_(Period.start_date == period.start_date, Period.id < period.id)
+        )
+    return db.query(Period).filter(earlier).order_by(Period.start_date.desc(), Period.id.desc()).first()
+
+def parse_period_date(value):
+    """Parses an ISO date string from a request payload into a naive datetime."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed.replace(tzinfo=None)
@@ -0,0 +1,90 @@
+# backend/utils/question_analytics.py
+# Question-level analytics: how each of the standard questions scores across
+# the organisation and per rated department.
+#
+# Questions are cloned per survey, so they are grouped by their template
+# (order, category, text). One grouped query returns rating sum, count and
+# low-rating (1 or 2) count per (template, rated department); the org-wide
+# figures are summed from those rows, so both views come from one scan.
+
+from collections import defaultdict
+from sqlalchemy import func, case
+from backend.models import Question, Survey, Department
+from backend.utils.history import answers_with_history
+
+LOW_RATINGS = (1, 2)
+
+
+def _question_row(key, total, count, low):
+    order, category, text = key
+    return {
+        "order": order,
+        "category": category,
+        "text": text,
+        "mean": round(total / count, 2) if count else None,
+        "low_share": round(low / count, 4) if count else None,
+        "low_count": low,
+        "count": count,
+    }
+
+
+def _ranked(rows):
+    # Weakest first: lowest mean, then highest share of low ratings
+    rows.sort(key=lambda r: (r["mean"] if r["mean"] is not None else float('inf'), -(r["low_share"] or 0), r["order"] or 0))
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+    return rows
+
+
+def question_analytics(db, period_id=None, rated_department_id=None):
+    Answers = answers_with_history()
+    query = (
+        db.query(
+            Question.order,
+            Question.category,
+            Question.text,
+            Survey.rated_department_id,
+            func.sum(Answers.rating_value).label('total'),
+            func.count(Answers.rating_value).label('count'),
+            func.sum(case((Answers.rating_value.in_(LOW_RATINGS), 1), else_=0)).label('low')
+        )
+        .join(Question, Question.id == Answers.question_id)
+        .join(Survey, Survey.id == Question.survey_id)
+        .filter(Question.type == 'rating', Answers.rating_value != None)
+        .group_by(Question.order, Question.category, Question.text, Survey.rated_department_id)
+    )
+    if period_id is not None:
+        query = query.filter(Survey.period_id == period_id)
+    if rated_department_id is not None:
+        query = query.filter(Survey.rated_department_id == rated_department_id)
+    rows = query.all()
+
+    org_totals = defaultdict(lambda: [0, 0, 0])
+    by_department = defaultdict(list)
+    for order, category, text, department_id, total, count, low in rows:
+        key = (order, category, text)
+        totals = org_totals[key]
+        totals[0] += total or 0
+        totals[1] += count
+        totals[2] += low or 0
+        by_department[department_id].append(_question_row(key, total or 0, count, low or 0))
+
+    names = dict(
+        db.query(Department.id, Department.name).filter(Department.id.in_(list(by_department))).all()
+    ) if by_department else {}
+
+    return {
+        "period_id": period_id,
+        "questions": _ranked([_question_row(key, *totals) for key, totals in org_totals.items()]),
+        "departments": sorted(
+            [
+                {
+                    "department_id": department_id,
+                    "name": names.get(department_id, "Unknown"),
+                    "questions": _ranked(questions)
+                }
+                for department_id, questions in by_department.items()
+            ],
+            key=lambda d: d["name"]
+        )
+    }
@@ -0,0 +1,157 @@
+# backend/utils/rating_stats.py
+# Rating distribution statistics per rated department and category.
+#
+# The ratings of a period are read once as packed vectors (see
+# rating_vectors.load_rating_matrix) and every statistic is computed with
+# grouped NumPy operations over the whole matrix, with no per-department
+# Python loop over rows:
+#
+#   - category statistics come from 1-4 histograms built with one bincount
+#     per category; mean, std and percentiles are derived from the counts
+#   - overall ratings (0-100, continuous) are sorted once by department and
+#     percentiles are read at interpolated positions inside each group
+
+import numpy as np
+from backend.models import Department
+from backend.utils.rating_vectors import CATEGORY_SLICES, load_rating_matrix, overall_ratings
+
+PERCENTILES = (25, 50, 75, 90)
+RATING_VALUES = np.arange(1, 5, dtype=np.float64)
+
+
+def _percentile_positions(counts, q):
+    # Linear interpolation between closest ranks, like np.percentile's default
+    position = np.maximum(counts - 1, 0) * (q / 100.0)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    return lower, upper, position - lower
+
+
+def histogram_stats(histograms):
+    """
+    Statistics for many groups of 1-4 ratings at once, from their histograms.
+    histograms: (groups, 4) counts of ratings 1, 2, 3 and 4.
+    """
+    histograms = np.asarray(histograms, dtype=np.int64)
+    counts = histograms.sum(axis=1)
+    safe_counts = np.maximum(counts, 1)
+    mean = (histograms * RATING_VALUES).sum(axis=1) / safe_counts
+    variance = (histograms * (RATING_VALUES - mean[:, None]) ** 2).sum(axis=1) / safe_counts
+    cumulative = histograms.cumsum(axis=1)
+
+    def rating_at(rank):
+        # The rating at 0-based rank within each group's sorted ratings
+        return (cumulative <= rank[:, None]).sum(axis=1) + 1
+
+    stats = {"count": counts, "mean": mean, "std": np.sqrt(variance), "histogram": histograms}
+    for q in PERCENTILES:
+        lower, upper, fraction = _percentile_positions(counts, q)
+        low = rating_at(lower)
+        stats[f"p{q}"] = low + (rating_at(upper) - low) * fraction
+
+    empty = counts == 0
+    for key in ("mean", "std", *[f"p{q}" for q in PERCENTILES]):
+        stats[key] = np.where(empty, np.nan, stats[key])
+    return stats
+
+
+def grouped_stats(values, groups, group_count):
+    """Mean, std, min, max and percentiles of `values` per integer group id, NaNs ignored."""
+    values = np.asarray(values, dtype=np.float64)
+    groups = np.asarray(groups, dtype=np.int64)
+    valid = ~np.isnan(values)
+    values, groups = values[valid], groups[valid]
+
+    order = np.lexsort((values, groups))
+    values, groups = values[order], groups[order]
+    counts = np.bincount(groups, minlength=group_count)
+    starts = np.concatenate(([0], counts.cumsum()[:-1])).astype(np.int64)
+    safe_counts = np.maximum(counts, 1)
+    mean = np.bincount(groups, weights=values, minlength=group_count) / safe_counts
+    variance = np.bincount(groups, weights=(values - mean[groups]) ** 2, minlength=group_count) / safe_counts
+
+    empty = counts == 0
+    padded = np.append(values, np.nan)  # Index len(values) is a safe read for empty groups
+
+    def at(index):
+        return padded[np.where(empty, len(values), index)]
+
+    stats = {
+        "count": counts,
+        "mean": np.where(empty, np.nan, mean),
+        "std": np.where(empty, np.nan, np.sqrt(variance)),
+        "min": at(starts),
+        "max": at(starts + counts - 1),
+    }
+    for q in PERCENTILES:
+        lower, upper, fraction = _percentile_positions(counts, q)
+        low = at(starts + lower)
+        stats[f"p{q}"] = low + (at(starts + upper) - low) * fraction
+    return stats
+
+
+def compute_rating_stats(ratings, rated_department_ids):
+    """
+    Distribution statistics per rated department for a decoded (n, 20)
+    rating matrix. Returns (department ids, overall stats, {category: stats});
+    every stats array is indexed like the department ids.
+    """
+    department_ids, group = np.unique(np.asarray(rated_department_ids, dtype=np.int64), return_inverse=True)
+    group_count = len(department_ids)
+    ratings = np.asarray(ratings)
+
+    overall = grouped_stats(overall_ratings(ratings), group, group_count)
+    overall["submissions"] = np.bincount(group, minlength=group_count)
+
+    categories = {}
+    for category, columns in CATEGORY_SLICES.items():
+        block = ratings[:, columns].astype(np.int64)
+        keys = group[:, None] * 5 + block  # 0 (unanswered) lands in a dropped bucket
+        histograms = np.bincount(keys.ravel(), minlength=group_count * 5).reshape(group_count, 5)[:, 1:]
+        categories[category] = histogram_stats(histograms)
+    return department_ids, overall, categories
+
+
+def _number(value):
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def _stats_row(stats, i, keys):
+    return {key: _number(stats[key][i]) for key in keys}
+
+
+def period_rating_stats(db, period_id=None, rated_department_id=None):
+    """Loads one period's ratings in a single chunked scan and shapes the per-department statistics."""
+    data = load_rating_matrix(db, rated_department_id=rated_department_id, period_id=period_id)
+    department_ids, overall, categories = compute_rating_stats(data["ratings"], data["rated_department_ids"])
+
+    names = dict(
+        db.query(Department.id, Department.name).filter(Department.id.in_(department_ids.tolist())).all()
+    ) if len(department_ids) else {}
+    percentile_keys = [f"p{q}" for q in PERCENTILES]
+
+    departments = []
+    for i, department_id in enumerate(department_ids.tolist()):
+        departments.append({
+            "department_id": department_id,
+            "name": names.get(department_id, "Unknown"),
+            "submissions": int(overall["submissions"][i]),
+            "overall": {
+                "count": int(overall["count"][i]),
+                **_stats_row(overall, i, ["mean", "std", "min", "max", *percentile_keys])
+            },
+            "categories": {
+                category: {
+                    "count": int(stats["count"][i]),
+                    **_stats_row(stats, i, ["mean", "std", *percentile_keys]),
+                    "histogram": stats["histogram"][i].tolist(),
+                }
+                for category, stats in categories.items()
+            }
+        })
+    departments.sort(key=lambda d: d["name"])
+    return {
+        "period_id": period_id,
+        "submissions": int(len(data["submission_ids"])),
+        "departments": departments
+    }
@@ -0,0 +1,149 @@
+# backend/utils/rating_vectors.py
+# Compact per-submission rating vectors.
+#
+# Every submission stores its 20 template ratings as a fixed-width string in
+# survey_submissions.rating_vector: position i holds the rating ('1'-'4') of
+# the question with order i + 1, '0' means unanswered. Analytics read just
+# this one narrow column and decode many submissions at once into a NumPy
+# matrix instead of re-aggregating survey_answers row by row.
+
+import numpy as np
+from collections import defaultdict
+from sqlalchemy import select, update, bindparam, cast, func, Integer
+from backend.models import SurveySubmission, Survey, Answer, Question
+from backend.utils.history import survey_submissions_with_history
+from backend.scripts.populate_questions_for_surveys import STANDARD_QUESTIONS
+
+RATING_VECTOR_LENGTH = len(STANDARD_QUESTIONS)
+MISSING = 0
+
+def _category_slices():
+    orders = defaultdict(list)
+    for category, _, _, order in STANDARD_QUESTIONS:
+        orders[category].append(order)
+    return {category: slice(min(o) - 1, max(o)) for category, o in orders.items()}
+
+# Column slice of the matrix for every category, in template order
+CATEGORY_SLICES = _category_slices()
+
+BACKFILL_CHUNK_SIZE = 500
+LOAD_CHUNK_SIZE = 5000
+
+def encode_rating_vector(ratings_by_order):
+    """{question order: rating} -> fixed-width string such as '43340000...'."""
+    digits = ['0'] * RATING_VECTOR_LENGTH
+    for order, rating in ratings_by_order.items():
+        if order and 1 <= order <= RATING_VECTOR_LENGTH and rating in (1, 2, 3, 4):
+            digits[order - 1] = str(rating)
+    return ''.join(digits)
+
+def decode_rating_vectors(vectors):
+    """
+    Decodes a sequence of rating vectors into an (n, 20) uint8 matrix in one
+    pass. Missing vectors (None) decode to an all-zero row.
+    """
+    if not len(vectors):
+        return np.zeros((0, RATING_VECTOR_LENGTH), dtype=np.uint8)
+    blank = '0' * RATING_VECTOR_LENGTH
+    packed = ''.join((v or blank).ljust(RATING_VECTOR_LENGTH, '0')[:RATING_VECTOR_LENGTH] for v in vectors)
+    matrix = np.frombuffer(packed.encode('ascii'), dtype=np.uint8).reshape(len(vectors), RATING_VECTOR_LENGTH)
+    return matrix - ord('0')
+
+def overall_ratings(matrix):
+    """
+    Vectorised equivalent of calculate_overall_rating() for a decoded matrix:
+    average of the category averages scaled to 0-100. Rows with any
+    unanswered question get NaN.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    complete = (matrix != MISSING).all(axis=1)
+    category_means = np.stack([matrix[:, s].mean(axis=1) for s in CATEGORY_SLICES.values()], axis=1)
+    overall = category_means.mean(axis=1) * 25
+    overall[~complete] = np.nan
+    return overall
+
+def category_score_expressions(vector_column):
+    """
+    SQL expressions giving each category's average rating (1-4) for one row,
+    computed from the packed vector column. Wrap them in func.avg() to
+    aggregate category scores inside a GROUP BY query.
+    """
+    expressions = {}
+    for category, columns in CATEGORY_SLICES.items():
+        digits = [
+            cast(func.substring(vector_column, position + 1, 1), Integer)
+            for position in range(columns.start, columns.stop)
+        ]
+        total = digits[0]
+        for digit in digits[1:]:
+            total = total + digit
+        expressions[category] = total / float(len(digits))
+    return expressions
+
+def load_rating_matrix(db, rated_department_id=None, submitter_department_id=None, period_id=None,
+                       chunk_size=LOAD_CHUNK_SIZE):
+    """
+    Single narrow scan over survey_submissions (hot and archived, so closed
+    periods still have data), streamed and decoded in chunks of `chunk_size`
+    rows. Returns a dict with the submission ids, rated / submitter
+    department ids (as arrays) and the decoded (n, 20) rating matrix.
+    """
+    Submissions = survey_submissions_with_history()
+    query = select(
+        Submissions.id,
+        Submissions.rated_department_id,
+        Submissions.submitter_department_id,
+        Submissions.rating_vector
+    ).where(
+        Submissions.rating_vector != None,
+        Submissions.status != 'Draft'
+    )
+    if rated_department_id is not None:
+        query = query.where(Submissions.rated_department_id == rated_department_id)
+    if submitter_department_id is not None:
+        query = query.where(Submissions.submitter_department_id == submitter_department_id)
+    if period_id is not None:
+        query = query.join(Survey, Survey.id == Submissions.survey_id).where(Survey.period_id == period_id)
+
+    ids, rated, submitters, matrices = [], [], [], []
+    result = db.execute(query, execution_options={"yield_per": chunk_size})
+    for rows in result.partitions():
+        ids.extend(r[0] for r in rows)
+        rated.extend(r[1] for r in rows)
+        submitters.extend(r[2] for r in rows)
+        matrices.append(decode_rating_vectors([r[3] for r in rows]))
+    return {
+        "submission_ids": np.array(ids, dtype=np.int64),
+        "rated_department_ids": np.array(rated, dtype=np.int64),
+        "submitter_department_ids": np.array(submitters, dtype=np.int64),
+        "ratings": np.concatenate(matrices) if matrices else decode_rating_vectors([]),
+    }
+
+def backfill_rating_vectors(db, chunk_size=BACKFILL_CHUNK_SIZE):
+    """Fills rating_vector for submissions created before the column existed."""
+    pending = db.execute(
+        select(SurveySubmission.id).where(
+            SurveySubmission.rating_vector == None,
+            SurveySubmission.status != 'Draft'
+        ).order_by(SurveySubmission.id)
+    ).scalars().all()
+
+    table = SurveySubmission.__table__
+    stmt = update(table).where(table.c.id == bindparam('submission_id')).values(rating_vector=bindparam('vector'))
+    updated = 0
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        ratings = {submission_id: {} for submission_id in chunk}
+        for submission_id, order, rating in db.execute(
+            select(Answer.submission_id, Question.order, Answer.rating_value)
+            .join(Question, Question.id == Answer.question_id)
+            .where(Answer.submission_id.in_(chunk))
+        ):
+            ratings[submission_id][order] = rating
+        db.execute(stmt, [
+            {"submission_id": submission_id, "vector": encode_rating_vector(by_order)}
+            for submission_id, by_order in ratings.items()
+        ])
+        db.commit()
+        updated += len(chunk)
+    return updated
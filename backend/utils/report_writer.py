@@ -0,0 +1,97 @@
+# backend/utils/report_writer.py
+# Styled .xlsx reports written in one forward pass.
+#
+# Built on openpyxl's write_only workbook: rows are streamed to the file as
+# they are appended, so a report is never held as a cell grid, parsed back or
+# saved twice. Cell formats are registered once per workbook as named styles
+# and applied to each cell by name. Because rows are written immediately,
+# column widths, row heights and merged ranges must be known before (or, for
+# merges, at the latest while) the rows are written:
+#
+#     report = ReportWriter()
+#     report.add_format('header', font=Font(bold=True), fill=HEADER_FILL, border=THIN_BORDER)
+#     sheet = report.add_sheet('Report', column_widths=[10, 40])
+#     sheet.write_row(["Title", None], 'header', height=40, merges=[(1, 2)])
+#     sheet.write_row([1, "Text"], ['centered', 'text'])
+#     return send_file(report.to_bytes(), ...)
+
+import io
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, Alignment, Border, Side
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+
+THIN_SIDE = Side(style='thin')
+THIN_BORDER = Border(left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=THIN_SIDE)
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class ReportSheet:
+    def __init__(self, worksheet, column_widths=None):
+        self._ws = worksheet
+        self._row = 0
+        for index, width in enumerate(column_widths or [], 1):
+            if width:
+                self._ws.column_dimensions[get_column_letter(index)].width = width
+
+    @property
+    def next_row(self):
+        """1-based index of the row the next write_row() call produces."""
+        return self._row + 1
+
+    def merge(self, first_row, first_column, last_row, last_column):
+        """Merges a range (1-based, inclusive). Only its top-left cell should hold a value."""
+        self._ws.merged_cells.add(
+            f"{get_column_letter(first_column)}{first_row}:{get_column_letter(last_column)}{last_row}"
+        )
+
+    def write_row(self, values, formats=None, height=None, merges=()):
+        """
+        Appends one row. formats is a format name for every cell, or a list
+        with one name (or None) per column. merges lists (first_column,
+        last_column) ranges within this row. Empty strings are written as
+        blank cells.
+        """
+        self._row += 1
+        if height:
+            self._ws.row_dimensions[self._row].height = height
+        for first_column, last_column in merges:
+            self.merge(self._row, first_column, self._row, last_column)
+
+        if formats is None or isinstance(formats, str):
+            formats = [formats] * len(values)
+        cells = []
+        for value, style in zip(values, formats):
+            cell = WriteOnlyCell(self._ws, value=None if value == "" else value)
+            if style:
+                cell.style = style
+            cells.append(cell)
+        self._ws.append(cells)
+
+
+class ReportWriter:
+    def __init__(self):
+        self._workbook = Workbook(write_only=True)
+
+    def add_format(self, name, font=None, fill=None, border=None, alignment=None):
+        """Registers a named cell format; pass the name to ReportSheet.write_row()."""
+        style = NamedStyle(name=name, font=font or DEFAULT_FONT)
+        if fill is not None:
+            style.fill = fill
+        if border is not None:
+            style.border = border
+        style.alignment = alignment or Alignment()
+        self._workbook.add_named_style(style)
+
+    def add_sheet(self, title, column_widths=None):
+        """New sheet; column_widths lists the width of each column from A (None keeps the default)."""
+        return ReportSheet(self._workbook.create_sheet(title), column_widths)
+
+    def to_bytes(self):
+        """Finishes the workbook and returns it as a BytesIO positioned at the start."""
+        output = io.BytesIO()
+        self._workbook.save(output)
+        output.seek(0)
+        return output
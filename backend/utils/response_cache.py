@@ -0,0 +1,170 @@
+# backend/utils/response_cache.py
+# In-process TTL cache for read-heavy JSON endpoints (the dashboards).
+#
+# Usage (below @paseto_required so the identity is known):
+#
+#     @dashboard_bp.route('/admin-stats', methods=['GET'])
+#     @paseto_required()
+#     @cached_response('dashboard', ttl=30)
+#     def get_admin_dashboard_stats(): ...
+#
+# Entries are keyed by endpoint, scope (global / user / department) and query
+# string, and are dropped early by write paths through invalidate(). Each
+# worker process has its own cache; TTLs bound how stale another worker can be.
+
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+from flask import request, make_response
+from backend.database import SessionLocal
+from backend.models import User
+from backend.utils.paseto_utils import get_paseto_identity
+
+SCOPE_GLOBAL = 'global'
+SCOPE_USER = 'user'
+SCOPE_DEPARTMENT = 'department'
+
+# How long a username -> department id lookup is reused for department scoping
+DEPARTMENT_LOOKUP_TTL = 300
+
+
+class ResponseCache:
+    def __init__(self):
+        self._entries = {}
+        self._departments = {}
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["expires_at"] > now:
+                self._stats[key[1]]["hits"] += 1
+                return entry
+            if entry:
+                del self._entries[key]
+            self._stats[key[1]]["misses"] += 1
+            return None
+
+    def set(self, key, ttl, department_id, body, status, mimetype):
+        with self._lock:
+            self._entries[key] = {
+                "expires_at": time.monotonic() + ttl,
+                "department_id": department_id,
+                "body": body,
+                "status": status,
+                "mimetype": mimetype,
+            }
+
+    def invalidate(self, group=None, department_id=None):
+        """
+        Drops cached responses of `group` (all groups if None). With a
+        department_id, department-scoped entries of other departments are kept.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if group is not None and key[0] != group:
+                    continue
+                entry_department = self._entries[key]["department_id"]
+                if department_id is not None and entry_department not in (None, department_id):
+                    continue
+                del self._entries[key]
+
+    def department_for(self, username):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._departments.get(username)
+            if cached and cached[1] > now:
+                return cached[0]
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.username == username).first()
+            department_id = user.department_id if user else None
+        finally:
+            db.close()
+        with self._lock:
+            self._departments[username] = (department_id, now + DEPARTMENT_LOOKUP_TTL)
+        return department_id
+
+    def stats(self):
+        with self._lock:
+            routes = {}
+            total_hits = total_misses = 0
+            for endpoint, counts in self._stats.items():
+                lookups = counts["hits"] + counts["misses"]
+                routes[endpoint] = {
+                    **counts,
+                    "hit_ratio": round(counts["hits"] / lookups, 4) if lookups else 0.0
+                }
+                total_hits += counts["hits"]
+                total_misses += counts["misses"]
+            lookups = total_hits + total_misses
+            return {
+                "entries": len(self._entries),
+                "hits": total_hits,
+                "misses": total_misses,
+                "hit_ratio": round(total_hits / lookups, 4) if lookups else 0.0,
+                "routes": routes,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def request_cache_key(group, scope=SCOPE_GLOBAL):
+    """
+    Key identifying "the same request" for the current view: endpoint, scope
+    (global / user / department) and query string. Returns (key, department_id).
+    """
+    department_id = None
+    if scope == SCOPE_USER:
+        scope_key = get_paseto_identity()
+    elif scope == SCOPE_DEPARTMENT:
+        department_id = response_cache.department_for(get_paseto_identity())
+        scope_key = department_id
+    else:
+        scope_key = None
+    return (group, request.endpoint, scope, scope_key, request.query_string.decode()), department_id
+
+
+def refresh_requested():
+    """True when the query string asks for a forced recompute (?refresh=true)."""
+    return request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+
+
+def cached_response(group, ttl, scope=SCOPE_GLOBAL, bypass=None):
+    """
+    Caches successful (200) responses of a GET view for `ttl` seconds. When
+    bypass() returns True the view runs and its response is not cached.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            if bypass is not None and bypass():
+                response = make_response(fn(*args, **kwargs))
+                response.headers['X-Cache'] = 'BYPASS'
+                return response
+
+            key, department_id = request_cache_key(group, scope)
+
+            entry = response_cache.get(key)
+            if entry:
+                response = make_response(entry["body"], entry["status"])
+                response.mimetype = entry["mimetype"]
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                response_cache.set(key, ttl, department_id, response.get_data(), response.status_code, response.mimetype)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return decorator
+    return wrapper
+
+
+def invalidate_dashboards(department_id=None):
+    """Called by write paths that change anything the dashboards show."""
+    response_cache.invalidate('dashboard', department_id=department_id)
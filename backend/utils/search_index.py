@@ -0,0 +1,273 @@
+# backend/utils/search_index.py
+# Full-text search over feedback text.
+#
+# Every searchable row becomes one document in an in-memory SQLite FTS5 table
+# (an inverted index with BM25 ranking, from the Python standard library):
+#
+#   - each survey_responses row: remark, explanation, action_plan, final_suggestion
+#   - each survey_submissions row: suggestions
+#
+# together with the filter columns (departments, period, category, date).
+# The index is built from the database (hot and archived rows) on first use,
+# kept current by the write paths through index_submission() and
+# index_response(), and rebuilt in the background every REBUILD_INTERVAL
+# seconds so writes handled by other worker processes show up too.
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from sqlalchemy import select, exists, and_
+from backend.database import SessionLocal
+from backend.models import Survey, Question, SurveyResponse, SurveySubmission
+from backend.utils.history import survey_responses_with_history, survey_submissions_with_history
+
+logger = logging.getLogger(__name__)
+
+REBUILD_INTERVAL = 600
+BUILD_CHUNK_SIZE = 2000
+
+KIND_RESPONSE = 'response'
+KIND_SUBMISSION = 'submission'
+
+# Text columns first, then UNINDEXED filter / display columns
+TEXT_FIELDS = ('remark', 'explanation', 'action_plan', 'final_suggestion', 'suggestions')
+META_FIELDS = ('kind', 'source_id', 'from_department_id', 'to_department_id', 'period_id', 'category', 'submitted_at')
+
+_SCHEMA = (
+    "CREATE VIRTUAL TABLE documents USING fts5("
+    + ", ".join(TEXT_FIELDS)
+    + ", "
+    + ", ".join(f"{field} UNINDEXED" for field in META_FIELDS)
+    + ", tokenize='porter unicode61')"
+)
+_INSERT = (
+    f"INSERT INTO documents (rowid, {', '.join(TEXT_FIELDS + META_FIELDS)}) "
+    f"VALUES (?, {', '.join('?' * len(TEXT_FIELDS + META_FIELDS))})"
+)
+
+
+def _rowid(kind, source_id):
+    # Responses and submissions have separate id spaces; interleave them
+    return source_id * 2 + (1 if kind == KIND_SUBMISSION else 0)
+
+
+def _match_expression(text, any_term=False):
+    """Turns free text into a safe FTS5 query: quoted terms, the last one as a prefix."""
+    terms = re.findall(r"\w+", text or "")
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return (" OR " if any_term else " ").join(quoted)
+
+
+def _response_query(Responses):
+    return (
+        select(
+            Responses.id,
+            Responses.remark,
+            Responses.explanation,
+            Responses.action_plan,
+            Responses.final_suggestion,
+            Responses.from_department_id,
+            Responses.to_department_id,
+            Survey.period_id,
+            Question.category,
+            Responses.submitted_at
+        )
+        .outerjoin(Survey, Survey.id == Responses.survey_id)
+        .outerjoin(Question, Question.id == Responses.question_id)
+    )
+
+
+def _submission_query(Submissions, Responses):
+    # Suggestions already copied onto the summary response as final_suggestion are indexed there
+    copied = exists().where(and_(
+        Responses.survey_submission_id == Submissions.id,
+        Responses.final_suggestion == Submissions.suggestions
+    ))
+    return (
+        select(
+            Submissions.id,
+            Submissions.suggestions,
+            Submissions.submitter_department_id,
+            Submissions.rated_department_id,
+            Survey.period_id,
+            Submissions.submitted_at
+        )
+        .outerjoin(Survey, Survey.id == Submissions.survey_id)
+        .where(Submissions.suggestions != None, Submissions.suggestions != '', Submissions.status != 'Draft', ~copied)
+    )
+
+
+def _response_document(row):
+    response_id, remark, explanation, action_plan, final_suggestion, from_id, to_id, period_id, category, submitted_at = row
+    if not any((remark, explanation, action_plan, final_suggestion)):
+        return None
+    return (
+        _rowid(KIND_RESPONSE, response_id),
+        remark, explanation, action_plan, final_suggestion, None,
+        KIND_RESPONSE, response_id, from_id, to_id, period_id, category,
+        submitted_at.isoformat() if submitted_at else None
+    )
+
+
+def _submission_document(row):
+    submission_id, suggestions, from_id, to_id, period_id, submitted_at = row
+    return (
+        _rowid(KIND_SUBMISSION, submission_id),
+        None, None, None, None, suggestions,
+        KIND_SUBMISSION, submission_id, from_id, to_id, period_id, None,
+        submitted_at.isoformat() if submitted_at else None
+    )
+
+
+class SearchIndex:
+    def __init__(self):
+        self._conn = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._rebuilding = threading.Lock()
+
+    # --- Building ---
+    def _build(self):
+        conn = sqlite3.connect(':memory:', check_same_thread=False)
+        conn.execute(_SCHEMA)
+        Responses = survey_responses_with_history()
+        Submissions = survey_submissions_with_history()
+        db = SessionLocal()
+        try:
+            for query, to_document in (
+                (_response_query(Responses), _response_document),
+                (_submission_query(Submissions, Responses), _submission_document),
+            ):
+                result = db.execute(query, execution_options={"yield_per": BUILD_CHUNK_SIZE})
+                for rows in result.partitions():
+                    conn.executemany(_INSERT, [d for d in map(to_document, rows) if d])
+            conn.commit()
+        finally:
+            db.close()
+        return conn
+
+    def rebuild(self, report=None):
+        """Builds a fresh index from the database and swaps it in. Returns the document count."""
+        with self._rebuilding:
+            conn = self._build()
+            count = conn.execute("SELECT count(*) FROM documents").fetchone()[0]
+            with self._lock:
+                old, self._conn = self._conn, conn
+                self._built_at = time.monotonic()
+            if old is not None:
+                old.close()
+        logger.info("Search index rebuilt with %s documents.", count)
+        return count
+
+    def _ensure_fresh(self):
+        if self._conn is None:
+            self.rebuild()
+        elif time.monotonic() - self._built_at > REBUILD_INTERVAL and not self._rebuilding.locked():
+            # Serve from the current index while a new one is built
+            threading.Thread(target=self._safe_rebuild, name='search-rebuild', daemon=True).start()
+
+    def _safe_rebuild(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            logger.error("Search index rebuild failed: %s", e, exc_info=True)
+
+    # --- Write-path updates ---
+    def _upsert(self, documents):
+        with self._lock:
+            if self._conn is None:
+                return  # Not built yet; the first build reads these rows from the database
+            for document in documents:
+                self._conn.execute("DELETE FROM documents WHERE rowid = ?", (document[0],))
+                self._conn.execute(_INSERT, document)
+            self._conn.commit()
+
+    def index_submission(self, db, submission_id):
+        """(Re)indexes a submission and its survey_responses rows. Never raises."""
+        if self._conn is None:
+            return
+        try:
+            # Fresh writes live in the hot tables
+            documents = [
+                _response_document(row) for row in
+                db.execute(_response_query(SurveyResponse).where(SurveyResponse.survey_submission_id == submission_id))
+            ]
+            documents += [
+                _submission_document(row) for row in
+                db.execute(_submission_query(SurveySubmission, SurveyResponse).where(SurveySubmission.id == submission_id))
+            ]
+            self._upsert([d for d in documents if d])
+        except Exception as e:
+            logger.error("Failed to index submission %s: %s", submission_id, e)
+
+    def index_response(self, db, response_id):
+        """(Re)indexes one survey_responses row. Never raises."""
+        self.index_responses(db, [response_id])
+
+    def index_responses(self, db, response_ids):
+        """(Re)indexes survey_responses rows by id with one query. Never raises."""
+        if self._conn is None or not response_ids:
+            return
+        try:
+            rows = db.execute(_response_query(SurveyResponse).where(SurveyResponse.id.in_(response_ids))).all()
+            self._upsert([d for d in map(_response_document, rows) if d])
+        except Exception as e:
+            logger.error("Failed to index responses %s: %s", response_ids, e)
+
+    # --- Searching ---
+    def search(self, text, department_id=None, from_department_id=None, period_id=None, category=None,
+               kind=None, any_term=False, page=1, page_size=20):
+        """
+        Ranked (BM25) search. department_id filters on the rated / receiving
+        department, from_department_id on the giving one. Returns
+        {"total", "results"} for the requested page, or None for an empty query.
+        """
+        match = _match_expression(text, any_term)
+        if match is None:
+            return None
+        self._ensure_fresh()
+
+        where = ["documents MATCH ?"]
+        params = [match]
+        for field, value in (
+            ('to_department_id', department_id),
+            ('from_department_id', from_department_id),
+            ('period_id', period_id),
+            ('category', category),
+            ('kind', kind),
+        ):
+            if value is not None:
+                where.append(f"{field} = ?")
+                params.append(value)
+        condition = " AND ".join(where)
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT count(*) FROM documents WHERE {condition}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {', '.join(META_FIELDS)}, bm25(documents) AS score, "
+                f"snippet(documents, -1, '[', ']', '...', 12) AS snippet, "
+                f"{', '.join(TEXT_FIELDS)} "
+                f"FROM documents WHERE {condition} ORDER BY score LIMIT ? OFFSET ?",
+                params + [page_size, (page - 1) * page_size]
+            ).fetchall()
+
+        results = []
+        for row in rows:
+            meta = dict(zip(META_FIELDS, row[:len(META_FIELDS)]))
+            score, snippet = row[len(META_FIELDS):len(META_FIELDS) + 2]
+            texts = dict(zip(TEXT_FIELDS, row[len(META_FIELDS) + 2:]))
+            results.append({
+                **meta,
+                "score": round(-score, 4),  # bm25() is lower-is-better
+                "snippet": snippet,
+                "fields": {field: value for field, value in texts.items() if value}
+            })
+        return {"total": total, "results": results}
+
+
+search_index = SearchIndex()
@@ -0,0 +1,114 @@
+# backend/utils/single_flight.py
+# Request coalescing for expensive read endpoints.
+#
+# When several identical requests (same endpoint, scope and query string, see
+# response_cache.request_cache_key) arrive while one is still being computed,
+# only the first runs the view; the others wait for it and get a copy of its
+# response. Usage (innermost, below any @cached_response):
+#
+#     @dashboard_bp.route('/admin-stats', methods=['GET'])
+#     @paseto_required()
+#     @cached_response('dashboard', ttl=30)
+#     @single_flight('dashboard')
+#     def get_admin_dashboard_stats(): ...
+#
+# Coalescing is per worker process.
+
+import threading
+from collections import defaultdict
+from functools import wraps
+from flask import request, make_response, Response
+from backend.utils.response_cache import request_cache_key, SCOPE_GLOBAL
+
+# Followers stop waiting after this many seconds and compute on their own
+WAIT_TIMEOUT = 120
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._stats = defaultdict(lambda: {"executions": 0, "coalesced": 0, "timeouts": 0})
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, name=None):
+        """
+        Runs fn() once per key at a time. Returns (result, shared): shared is
+        True when the result came from another caller's execution.
+        """
+        name = name or str(key)
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats[name]["executions"] += 1
+            else:
+                self._stats[name]["coalesced"] += 1
+
+        if not leader:
+            if call.done.wait(WAIT_TIMEOUT):
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            with self._lock:
+                self._stats[name]["timeouts"] += 1
+            return fn(), False
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            routes = {name: dict(counts) for name, counts in self._stats.items()}
+            in_flight = len(self._calls)
+        return {
+            "in_flight": in_flight,
+            "executions": sum(r["executions"] for r in routes.values()),
+            "coalesced": sum(r["coalesced"] for r in routes.values()),
+            "routes": routes,
+        }
+
+
+flights = SingleFlight()
+
+
+def single_flight(group, scope=SCOPE_GLOBAL, bypass=None):
+    """
+    Coalesces concurrent identical requests to a view into one execution.
+    When bypass() returns True the request runs on its own.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            if bypass is not None and bypass():
+                return fn(*args, **kwargs)
+
+            key, _ = request_cache_key(group, scope)
+
+            def compute():
+                response = make_response(fn(*args, **kwargs))
+                # Materialize file/stream bodies so every waiter gets its own copy
+                response.direct_passthrough = False
+                return response.get_data(), response.status_code, list(response.headers.items())
+
+            (body, status, headers), shared = flights.do(key, compute, request.endpoint)
+            response = Response(body, status=status, headers=headers)
+            response.headers['X-Coalesced'] = 'true' if shared else 'false'
+            return response
+        return decorator
+    return wrapper
@@ -0,0 +1,24 @@
+-- Packed per-submission rating vector (see backend/utils/rating_vectors.py)
+IF NOT EXISTS (
+    SELECT * FROM sys.columns
+    WHERE Name = N'rating_vector'
+    AND Object_ID = Object_ID(N'dbo.survey_submissions')
+)
+BEGIN
+    ALTER TABLE dbo.survey_submissions
+    ADD rating_vector VARCHAR(20) NULL;
+END
+GO
+
+IF OBJECT_ID(N'dbo.survey_submissions_archive') IS NOT NULL AND NOT EXISTS (
+    SELECT * FROM sys.columns
+    WHERE Name = N'rating_vector'
+    AND Object_ID = Object_ID(N'dbo.survey_submissions_archive')
+)
+BEGIN
+    ALTER TABLE dbo.survey_submissions_archive
+    ADD rating_vector VARCHAR(20) NULL;
+END
+GO
+
+-- Afterwards fill existing rows with: python -m backend.scripts.backfill_rating_vectors
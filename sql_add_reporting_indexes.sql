@@ -0,0 +1,54 @@
+-- Indexes backing the dashboard / reporting queries.
+-- New databases get them from init_db.py; run this once on existing ones.
+
+-- /api/dashboard/department-ratings: filter by receiving department and date
+IF NOT EXISTS (
+    SELECT * FROM sys.indexes
+    WHERE Name = N'ix_survey_responses_to_dept_submitted'
+    AND Object_ID = Object_ID(N'dbo.survey_responses')
+)
+BEGIN
+    CREATE INDEX ix_survey_responses_to_dept_submitted
+    ON dbo.survey_responses (to_department_id, submitted_at)
+    INCLUDE (from_department_id, overall_rating, survey_submission_id, survey_id);
+END
+GO
+
+-- /api/remarks/outgoing and customer-focus: filter by giving department and date
+IF NOT EXISTS (
+    SELECT * FROM sys.indexes
+    WHERE Name = N'ix_survey_responses_from_dept_submitted'
+    AND Object_ID = Object_ID(N'dbo.survey_responses')
+)
+BEGIN
+    CREATE INDEX ix_survey_responses_from_dept_submitted
+    ON dbo.survey_responses (from_department_id, submitted_at)
+    INCLUDE (to_department_id, rating, question_id, acknowledged);
+END
+GO
+
+-- Overdue action plan sweep: unacknowledged plans per receiving department by target date
+IF NOT EXISTS (
+    SELECT * FROM sys.indexes
+    WHERE Name = N'ix_survey_responses_to_dept_ack_target'
+    AND Object_ID = Object_ID(N'dbo.survey_responses')
+)
+BEGIN
+    CREATE INDEX ix_survey_responses_to_dept_ack_target
+    ON dbo.survey_responses (to_department_id, acknowledged, target_date)
+    INCLUDE (from_department_id, responsible_person);
+END
+GO
+
+-- Badge counters for action plans (department_counters predates them on existing databases)
+IF OBJECT_ID(N'dbo.department_counters') IS NOT NULL AND NOT EXISTS (
+    SELECT * FROM sys.columns
+    WHERE Name = N'overdue_action_plans'
+    AND Object_ID = Object_ID(N'dbo.department_counters')
+)
+BEGIN
+    ALTER TABLE dbo.department_counters
+    ADD overdue_action_plans INT NOT NULL DEFAULT 0,
+        due_soon_action_plans INT NOT NULL DEFAULT 0;
+END
+GO